@@ -1,26 +1,30 @@
 # Home.py
 
+import importlib
 import streamlit as st
-from problem_list_page import problem_list_page
-from coding_history_page import coding_history_page
-from account_info_page import account_info_page
-from upload_data_page import upload_data_page
+from instrumentation import span
 
 def home():
     """The main function that controls page navigation after login."""
     st.sidebar.title("Navigation")
 
+    # Pages are (module, function) pairs imported on first selection, so their
+    # heavy dependencies (pandas, plotly, bs4, requests) stay off the startup path.
     pages = {
-        "Problem List": problem_list_page,
-        "Coding History": coding_history_page,
-        "Account Information": account_info_page,
-        "Upload Data": upload_data_page,
+        "Problem List": ("problem_list_page", "problem_list_page"),
+        "Coding History": ("coding_history_page", "coding_history_page"),
+        "Leaderboard": ("leaderboard_page", "leaderboard_page"),
+        "Account Information": ("account_info_page", "account_info_page"),
+        "Backup": ("backup_page", "backup_page"),
+        "Upload Data": ("upload_data_page", "upload_data_page"),
     }
 
     page_labels = {
         "Problem List": "📋 Problem List",
         "Coding History": "🗓️ Coding History",
+        "Leaderboard": "🏆 Leaderboard",
         "Account Information": "👤 Account Info",
+        "Backup": "💾 Backup & Restore",
         "Upload Data": "⚙️ Upload Data"
     }
 
@@ -30,4 +34,7 @@ def home():
         format_func=lambda x: page_labels[x]
     )
 
-    pages[page_selection]()
+    module_name, function_name = pages[page_selection]
+    with span(page_selection):
+        page = getattr(importlib.import_module(module_name), function_name)
+        page()
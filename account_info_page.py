@@ -2,44 +2,21 @@
 
 import streamlit as st
 from database import users_collection, problems_collection
-import requests
-from bs4 import BeautifulSoup
-
-def fetch_leetcode_solved(username):
-    try:
-        url = f"https://leetcode-stats-api.herokuapp.com/{username}"
-        response = requests.get(url)
-        if response.status_code == 200:
-            data = response.json()
-            return data.get("totalSolved", "N/A")
-    except:
-        pass
-    return "N/A"
-
-def fetch_gfg_solved(username):
-    try:
-        url = f"https://auth.geeksforgeeks.org/user/{username}/practice/"
-        response = requests.get(url)
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.text, "html.parser")
-            count_tag = soup.find("h5", string="Coding Score")
-            solved_tag = soup.find("div", class_="score_card_value")
-            if solved_tag:
-                return solved_tag.text.strip()
-    except:
-        pass
-    return "N/A"
+from progress import get_progress_counters
+from stats_fetcher import PROVIDERS, get_stats
 
 def account_info_page():
     st.title("👤 Account Information")
     st.header(f"Welcome, {st.session_state.username.capitalize()}!")
     st.divider()
 
-    user_data = users_collection.find_one({"username": st.session_state.username}) or {}
-    user_progress = user_data.get("progress", {})
-    total_problems = problems_collection.count_documents({})
-    solved_count = sum(1 for data in user_progress.values() if data.get("solved"))
-    revised_count = sum(1 for data in user_progress.values() if data.get("revised"))
+    user_data = users_collection.find_one(
+        {"username": st.session_state.username}, {"stats": 1, **{provider: 1 for provider in PROVIDERS}}
+    ) or {}
+    counters = get_progress_counters(st.session_state.username, user_data)
+    total_problems = problems_collection.estimated_document_count()
+    solved_count = counters["solved"]
+    revised_count = counters["revised"]
 
     col1, col2, col3 = st.columns(3)
     col1.metric("Total Problems", total_problems)
@@ -50,27 +27,22 @@ def account_info_page():
 
     st.subheader("🌐 External Accounts")
 
-    leetcode = user_data.get("leetcode", "")
-    gfg = user_data.get("gfg", "")
-
-    new_leetcode = st.text_input("LeetCode Username", value=leetcode)
-    new_gfg = st.text_input("GeeksforGeeks Username", value=gfg)
+    accounts = {}
+    for provider, info in PROVIDERS.items():
+        accounts[provider] = st.text_input(f"{info['label']} Username", value=user_data.get(provider, ""))
 
     if st.button("💾 Save Usernames"):
         users_collection.update_one(
             {"username": st.session_state.username},
-            {"$set": {"leetcode": new_leetcode, "gfg": new_gfg}},
+            {"$set": accounts},
             upsert=True
         )
         st.success("Usernames saved!")
         st.rerun()
 
-    if leetcode:
-        st.info(f"🔎 Fetching LeetCode stats for `{leetcode}`...")
-        lc_solved = fetch_leetcode_solved(leetcode)
-        st.metric(label="✅ LeetCode Solved", value=lc_solved)
-
-    if gfg:
-        st.info(f"🔎 Fetching GeeksforGeeks stats for `{gfg}`...")
-        gfg_solved = fetch_gfg_solved(gfg)
-        st.metric(label="✅ GFG Solved (approx.)", value=gfg_solved)
+    saved_accounts = {provider: user_data.get(provider, "") for provider in PROVIDERS}
+    if any(saved_accounts.values()):
+        stats = get_stats(saved_accounts)
+        stat_cols = st.columns(len(stats) or 1)
+        for col, (provider, solved) in zip(stat_cols, stats.items()):
+            col.metric(label=f"✅ {PROVIDERS[provider]['label']} Solved", value=solved)
@@ -0,0 +1,118 @@
+# activity.py
+
+import datetime
+from bson import ObjectId
+from pymongo import UpdateOne
+from database import activity_collection, problems_collection, progress_collection
+
+HEATMAP_DAYS = 365
+
+def utc_today():
+    """Returns today's date in UTC, the timezone solve timestamps are stored in."""
+    return datetime.datetime.now(datetime.timezone.utc).date()
+
+def difficulty_key(difficulty):
+    """Normalizes a difficulty into the key used in the daily rollups."""
+    if isinstance(difficulty, str) and difficulty.strip() and "." not in difficulty and not difficulty.startswith("$"):
+        return difficulty.strip().title()
+    return "Unknown"
+
+def _rollup_update(username, solved_at, difficulty, delta):
+    """Returns the $inc upsert that applies a solve delta to its day's rollup."""
+    return UpdateOne(
+        {"username": username, "date": solved_at.strftime("%Y-%m-%d")},
+        {"$inc": {"count": delta, f"difficulty.{difficulty_key(difficulty)}": delta}},
+        upsert=True,
+    )
+
+def record_solve(username, solved_at, difficulty, delta):
+    """Adds delta (+1 or -1) to the user's rollup for the day a problem was solved."""
+    record_solves(username, [(solved_at, difficulty, delta)])
+
+def record_solves(username, entries):
+    """Applies several (solved_at, difficulty, delta) entries to the rollups in one bulk_write."""
+    operations = [
+        _rollup_update(username, solved_at, difficulty, delta)
+        for solved_at, difficulty, delta in entries
+        if isinstance(solved_at, datetime.datetime)
+    ]
+    if operations:
+        activity_collection.bulk_write(operations, ordered=False)
+
+def rebuild_activity(username, batch_size=1000):
+    """Recomputes a user's daily rollups from the progress collection."""
+    cursor = progress_collection.find(
+        {"username": username, "solved": True, "solved_at": {"$type": "date"}},
+        {"problem_id": 1, "solved_at": 1, "_id": 0},
+        batch_size=batch_size,
+    )
+    days = {}
+    batch = []
+
+    def flush(batch):
+        object_ids = [ObjectId(doc["problem_id"]) for doc in batch if ObjectId.is_valid(doc["problem_id"])]
+        difficulties = {
+            str(problem["_id"]): problem.get("difficulty")
+            for problem in problems_collection.find({"_id": {"$in": object_ids}}, {"difficulty": 1})
+        }
+        for doc in batch:
+            day = days.setdefault(doc["solved_at"].strftime("%Y-%m-%d"), {"count": 0, "difficulty": {}})
+            key = difficulty_key(difficulties.get(doc["problem_id"]))
+            day["count"] += 1
+            day["difficulty"][key] = day["difficulty"].get(key, 0) + 1
+
+    for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    activity_collection.delete_many({"username": username})
+    operations = [
+        UpdateOne({"username": username, "date": date}, {"$set": rollup}, upsert=True)
+        for date, rollup in days.items()
+    ]
+    if operations:
+        activity_collection.bulk_write(operations, ordered=False)
+    return len(operations)
+
+def load_activity(username, days=HEATMAP_DAYS):
+    """Returns the last `days` daily counts as a fixed-size list plus derived totals."""
+    today = utc_today()
+    start = today - datetime.timedelta(days=days - 1)
+    counts = [0] * days
+    by_difficulty = {}
+    for rollup in activity_collection.find(
+        {"username": username, "date": {"$gte": start.isoformat()}},
+        {"date": 1, "count": 1, "difficulty": 1, "_id": 0},
+    ):
+        index = (datetime.date.fromisoformat(rollup["date"]) - start).days
+        if 0 <= index < days:
+            counts[index] = max(rollup.get("count", 0), 0)
+        for key, value in rollup.get("difficulty", {}).items():
+            by_difficulty[key] = by_difficulty.get(key, 0) + value
+
+    # The current streak may end yesterday: today simply has not been solved yet.
+    current_streak = 0
+    for index in range(days - 1 if counts[-1] == 0 else days, 0, -1):
+        if counts[index - 1] == 0:
+            break
+        current_streak += 1
+
+    longest_streak = run = 0
+    for count in counts:
+        run = run + 1 if count else 0
+        longest_streak = max(longest_streak, run)
+
+    return {
+        "start": start,
+        "counts": counts,
+        "total": sum(counts),
+        "this_week": sum(counts[-today.isoweekday():]),
+        "this_month": sum(counts[-today.day:]),
+        "current_streak": current_streak,
+        "longest_streak": longest_streak,
+        "by_difficulty": {key: value for key, value in sorted(by_difficulty.items()) if value > 0},
+    }
@@ -1,8 +1,12 @@
 import streamlit as st
 st.set_page_config(page_title="Code Tracker", layout="wide")
+from instrumentation import start_rerun, finish_rerun, render_debug_panel
+start_rerun()
 from Home import home
-from database import users_collection, check_internet_connection
-from utility import hash_password, verify_password
+import local_cache
+from pymongo.errors import PyMongoError
+from database import check_db_connection, report_db_failure
+import auth_service
 
 
 # --- MAIN APP LAYOUT ---
@@ -16,69 +20,97 @@ if "username" not in st.session_state:
 # --- AUTHENTICATION FUNCTIONS ---
 def create_user(username, password):
     """Creates a new user in the database with a hashed password."""
-    if not check_internet_connection():
-        st.error("No internet connection. Please try again.")
+    if not check_db_connection():
+        st.error("Unable to reach the database. Please try again.")
         return False
-    if users_collection.find_one({"username": username}):
-        st.warning("Username already exists!")
+    try:
+        status = auth_service.register(username, password)
+    except PyMongoError:
+        report_db_failure()
+        st.error("Unable to reach the database. Please try again.")
         return False
-    else:
-        hashed_password = hash_password(password)
-        users_data = {"username": username, "password": hashed_password}
-        users_collection.insert_one(users_data)
-        return True
+    if status == auth_service.EXISTS:
+        st.warning("Username already exists!")
+    elif status == auth_service.BUSY:
+        st.error("Too many sign-ups right now. Please try again in a moment.")
+    return status == auth_service.OK
 
 def check_credentials(username, password) -> bool:
     """Checks user credentials against the database using hashed passwords."""
-    if not check_internet_connection():
-        st.error("No internet connection. Please try again.")
-        return False
-    
-    user = users_collection.find_one({"username": username})
-    if user and verify_password(user["password"], password):
-        return True
-    return False
+    status = None
+    if check_db_connection():
+        try:
+            status, password_hash = auth_service.authenticate(username, password)
+        except PyMongoError:
+            # MongoDB dropped since the last successful ping; fall back to the local cache below.
+            report_db_failure()
+        else:
+            if status == auth_service.OK and local_cache.enabled():
+                local_cache.remember_user(username, password_hash)
+    if status is None:
+        # Users who signed in here before can keep working against the local cache.
+        cached_password = local_cache.get_user_password(username) if local_cache.enabled() else None
+        if not cached_password:
+            st.error("Unable to reach the database. Please try again.")
+            return False
+        status, _ = auth_service.authenticate(username, password, cached_password)
+
+    if status == auth_service.THROTTLED:
+        st.error("Too many failed attempts. Please wait a few minutes and try again.")
+    elif status == auth_service.BUSY:
+        st.error("Too many sign-ins right now. Please try again in a moment.")
+    elif status == auth_service.INVALID:
+        st.error("Invalid username or password.")
+    return status == auth_service.OK
 
 
 
-# --- LOGIN/SIGNUP INTERFACE ---
-if not st.session_state["authenticated"]:
-    col1, col2, col3 = st.columns([1, 2, 1])
-    with col2:
-        tab1, tab2 = st.tabs(["Sign In", "Sign Up"])
-        with tab1:
-            with st.form("login_form"):
-                username = st.text_input("Username").lower().strip()
-                password = st.text_input("Password", type="password")
-                if st.form_submit_button("Login", use_container_width=True, type="primary"):
-                    if not username or ' ' in username or not password:
-                        st.error("Username and password cannot be empty or contain spaces.")
-                    elif check_credentials(username, password):
-                        st.session_state["authenticated"] = True
-                        st.session_state["username"] = username
-                        st.rerun()
-                    else:
-                        st.error("Invalid username or password.")
-        
-        with tab2:
-            with st.form("signup_form"):
-                new_username = st.text_input("New Username").lower().strip()
-                new_password = st.text_input("New Password", type="password")
-                confirm_password = st.text_input("Confirm Password", type="password")
-                if st.form_submit_button("Sign Up", use_container_width=True):
-                    if not new_username or ' ' in new_username or not new_password:
-                        st.error("Username and password cannot be empty or contain spaces.")
-                    elif new_password != confirm_password:
-                        st.error("Passwords don't match!")
-                    elif create_user(new_username, new_password):
-                        st.success("Account created successfully! Please sign in.")
+# Save handlers end with st.rerun(), which skips the rest of the script; finish_rerun()
+# still records those reruns, and the next panel shows them.
+try:
+    # --- LOGIN/SIGNUP INTERFACE ---
+    if not st.session_state["authenticated"]:
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            tab1, tab2 = st.tabs(["Sign In", "Sign Up"])
+            with tab1:
+                with st.form("login_form"):
+                    username = st.text_input("Username").lower().strip()
+                    password = st.text_input("Password", type="password")
+                    if st.form_submit_button("Login", use_container_width=True, type="primary"):
+                        if not username or ' ' in username or not password:
+                            st.error("Username and password cannot be empty or contain spaces.")
+                        elif check_credentials(username, password):
+                            if check_db_connection():
+                                from progress import migrate_user_progress
+                                migrate_user_progress(username)
+                            st.session_state["authenticated"] = True
+                            st.session_state["username"] = username
+                            st.rerun()
+
+            with tab2:
+                with st.form("signup_form"):
+                    new_username = st.text_input("New Username").lower().strip()
+                    new_password = st.text_input("New Password", type="password")
+                    confirm_password = st.text_input("Confirm Password", type="password")
+                    if st.form_submit_button("Sign Up", use_container_width=True):
+                        if not new_username or ' ' in new_username or not new_password:
+                            st.error("Username and password cannot be empty or contain spaces.")
+                        elif new_password != confirm_password:
+                            st.error("Passwords don't match!")
+                        elif create_user(new_username, new_password):
+                            st.success("Account created successfully! Please sign in.")
+
+    # --- AUTHENTICATED USER INTERFACE ---
+    else:
+        st.sidebar.success(f"Logged in as **{st.session_state.username}**")
+        if st.sidebar.button("Logout", key="logout"):
+            for key in list(st.session_state.keys()):
+                del st.session_state[key]
+            st.rerun()
+
+        home()
+finally:
+    finish_rerun()
 
-# --- AUTHENTICATED USER INTERFACE ---
-else:
-    st.sidebar.success(f"Logged in as **{st.session_state.username}**")
-    if st.sidebar.button("Logout", key="logout"):
-        for key in list(st.session_state.keys()):
-            del st.session_state[key]
-        st.rerun()
-        
-    home()
\ No newline at end of file
+render_debug_panel()
@@ -0,0 +1,191 @@
+# auth_service.py
+
+import multiprocessing.context
+import os
+import sys
+import threading
+import time
+import types
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from pymongo.errors import DuplicateKeyError
+import database
+import utility
+
+# --- Settings ---
+# Unset AUTH_HASH_ROUNDS keeps passlib's default pbkdf2_sha256 work factor.
+HASH_ROUNDS = int(os.environ["AUTH_HASH_ROUNDS"]) if os.environ.get("AUTH_HASH_ROUNDS") else None
+if HASH_ROUNDS is not None and HASH_ROUNDS < utility.MIN_ROUNDS:
+    raise ValueError(f"AUTH_HASH_ROUNDS must be at least {utility.MIN_ROUNDS}; lower values would weaken stored hashes")
+POOL_WORKERS = int(os.environ.get("AUTH_POOL_WORKERS", str(os.cpu_count() or 2)))
+MAX_PENDING = int(os.environ.get("AUTH_MAX_PENDING", str(POOL_WORKERS * 8)))
+QUEUE_TIMEOUT = float(os.environ.get("AUTH_QUEUE_TIMEOUT", "5"))
+HASH_TIMEOUT = float(os.environ.get("AUTH_HASH_TIMEOUT", "10"))
+MAX_FAILURES = int(os.environ.get("AUTH_MAX_FAILURES", "5"))
+THROTTLE_WINDOW = float(os.environ.get("AUTH_THROTTLE_WINDOW", "300"))
+
+# Login and signup outcomes.
+OK = "ok"
+INVALID = "invalid"
+THROTTLED = "throttled"
+BUSY = "busy"
+EXISTS = "exists"
+
+# Hashing runs in worker processes so sign-in spikes never hold the Streamlit
+# server's GIL. The pool is created on first use; at most MAX_PENDING jobs may
+# be queued or running at once, and callers beyond that wait QUEUE_TIMEOUT.
+_state = {"executor": None}
+_state_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(MAX_PENDING)
+
+# username -> monotonic times of recent failed attempts, per process.
+_failures = {}
+_failures_lock = threading.Lock()
+
+# Spawned workers normally re-run the parent's __main__ before their first job.
+# Under Streamlit that is the page script (or an AppTest script), so workers are
+# started with a bare __main__ that has no file to re-run; they import only the
+# modules their jobs need (utility and passlib).
+_WORKER_MAIN = types.ModuleType("__main__")
+_spawn_lock = threading.Lock()
+
+class _WorkerProcess(multiprocessing.context.SpawnProcess):
+    def start(self):
+        with _spawn_lock:
+            main = sys.modules["__main__"]
+            sys.modules["__main__"] = _WORKER_MAIN
+            try:
+                super().start()
+            finally:
+                # A script run that installed its own __main__ meanwhile keeps it.
+                if sys.modules["__main__"] is _WORKER_MAIN:
+                    sys.modules["__main__"] = main
+
+class _WorkerContext(multiprocessing.context.SpawnContext):
+    Process = _WorkerProcess
+
+def _executor():
+    """Returns the process pool, starting it on first use."""
+    if _state["executor"] is None:
+        with _state_lock:
+            if _state["executor"] is None:
+                _state["executor"] = ProcessPoolExecutor(max_workers=POOL_WORKERS, mp_context=_WorkerContext())
+    return _state["executor"]
+
+def _discard(executor):
+    """Drops a broken pool so the next job starts a fresh one."""
+    with _state_lock:
+        if _state["executor"] is executor:
+            _state["executor"] = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+def _run(function, *args):
+    """Runs a hashing function in the pool; returns None if the pool is saturated, slow or broken."""
+    if not _slots.acquire(timeout=QUEUE_TIMEOUT):
+        return None
+    executor = _executor()
+    try:
+        future = executor.submit(function, *args)
+    except BrokenProcessPool:
+        _slots.release()
+        _discard(executor)
+        return None
+    # The slot is held until the job really finishes, even if this caller stops waiting.
+    future.add_done_callback(lambda _: _slots.release())
+    try:
+        return future.result(timeout=HASH_TIMEOUT)
+    except TimeoutError:
+        future.cancel()
+        return None
+    except BrokenProcessPool:
+        _discard(executor)
+        return None
+
+def shutdown():
+    """Stops the worker processes, e.g. at the end of a benchmark."""
+    with _state_lock:
+        if _state["executor"] is not None:
+            _state["executor"].shutdown()
+            _state["executor"] = None
+
+# --- Throttling ---
+def _recent_failures(username, now):
+    """Returns the user's failures inside the throttle window, dropping older ones."""
+    attempts = _failures.get(username)
+    if attempts is None:
+        return 0
+    while attempts and now - attempts[0] >= THROTTLE_WINDOW:
+        attempts.popleft()
+    if not attempts:
+        del _failures[username]
+        return 0
+    return len(attempts)
+
+def is_throttled(username):
+    """Returns whether a user has too many recent failed attempts to try again yet."""
+    with _failures_lock:
+        return _recent_failures(username, time.monotonic()) >= MAX_FAILURES
+
+def _record_failure(username):
+    with _failures_lock:
+        _failures.setdefault(username, deque(maxlen=MAX_FAILURES)).append(time.monotonic())
+
+def _clear_failures(username):
+    with _failures_lock:
+        _failures.pop(username, None)
+
+# --- Public API ---
+def hash_password(password):
+    """Hashes a password at the configured work factor off the script thread; None if the pool is saturated."""
+    return _run(utility.hash_password, password, HASH_ROUNDS)
+
+def authenticate(username, password, stored_hash=None):
+    """Checks a login and returns (status, password_hash).
+
+    The user's hash is read by username, which a unique index serves, unless
+    stored_hash is given (e.g. a locally cached one while offline). A hash made
+    with another work factor is replaced after a successful login.
+    """
+    if is_throttled(username):
+        return THROTTLED, None
+    offline = stored_hash is not None
+    if not offline:
+        user = database.users_collection.find_one({"username": username}, {"password": 1, "_id": 0})
+        stored_hash = user.get("password") if user else None
+    if not stored_hash:
+        # Unknown users cost as much as wrong passwords, so timing does not reveal which names exist.
+        _run(utility.hash_password, password, HASH_ROUNDS)
+        _record_failure(username)
+        return INVALID, None
+
+    result = _run(utility.verify_and_update, stored_hash, password, HASH_ROUNDS)
+    if result is None:
+        return BUSY, None
+    verified, new_hash = result
+    if not verified:
+        _record_failure(username)
+        return INVALID, None
+    _clear_failures(username)
+    if new_hash and not offline:
+        # Only replace the hash that was verified, in case the password changed meanwhile.
+        database.users_collection.update_one({"username": username, "password": stored_hash}, {"$set": {"password": new_hash}})
+        stored_hash = new_hash
+    return OK, stored_hash
+
+def register(username, password):
+    """Creates a user and returns OK, EXISTS or BUSY.
+
+    Taken names are rejected up front, since the unique username index that
+    settles concurrent signups may not have been built yet.
+    """
+    if database.users_collection.find_one({"username": username}, {"_id": 1}):
+        return EXISTS
+    password_hash = hash_password(password)
+    if password_hash is None:
+        return BUSY
+    try:
+        database.users_collection.insert_one({"username": username, "password": password_hash})
+    except DuplicateKeyError:
+        return EXISTS
+    return OK
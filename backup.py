@@ -0,0 +1,273 @@
+# backup.py
+
+import argparse
+import csv
+import datetime
+import io
+import json
+import os
+import time
+from bson import ObjectId
+from pymongo import UpdateOne
+from database import problems_collection, progress_collection, notes_collection
+from progress import apply_progress_changes, get_progress_for_problems
+
+BATCH_SIZE = 1000
+FORMATS = ("csv", "jsonl", "parquet")
+
+# One row per problem the user has progress or a note for. Problem metadata is
+# included so a backup stays readable and can be matched by key or name when it
+# is restored into a database whose problem ids differ.
+EXPORT_COLUMNS = ["problem_id", "key", "name", "link", "difficulty", "solved", "solved_at", "revised", "note_text"]
+
+# --- Export ---
+def _problem_metadata(problem_ids):
+    """Returns {problem_id: problem} for problem id strings in one query."""
+    object_ids = [ObjectId(problem_id) for problem_id in problem_ids if ObjectId.is_valid(problem_id)]
+    return {
+        str(problem["_id"]): problem
+        for problem in problems_collection.find({"_id": {"$in": object_ids}}, {"key": 1, "name": 1, "link": 1, "difficulty": 1})
+    }
+
+def _export_row(problem_id, problem, progress, note_text):
+    """Builds one export row from a problem, its progress entry and its note."""
+    return {
+        "problem_id": problem_id,
+        "key": problem.get("key"),
+        "name": problem.get("name"),
+        "link": problem.get("link"),
+        "difficulty": problem.get("difficulty"),
+        "solved": bool(progress.get("solved")),
+        "solved_at": progress.get("solved_at"),
+        "revised": bool(progress.get("revised")),
+        "note_text": note_text,
+    }
+
+def iter_export_batches(username, batch_size=BATCH_SIZE):
+    """Yields lists of export rows, reading progress and then note-only problems through batched cursors."""
+    def progress_batch(batch):
+        ids = [doc["problem_id"] for doc in batch]
+        problems = _problem_metadata(ids)
+        notes = {
+            str(note["problem_id"]): note.get("note_text", "")
+            for note in notes_collection.find(
+                {"username": username, "problem_id": {"$in": [ObjectId(i) for i in ids if ObjectId.is_valid(i)]}},
+                {"problem_id": 1, "note_text": 1},
+            )
+        }
+        return [_export_row(doc["problem_id"], problems.get(doc["problem_id"], {}), doc, notes.get(doc["problem_id"], "")) for doc in batch]
+
+    def notes_batch(batch):
+        ids = [str(note["problem_id"]) for note in batch]
+        # Notes for problems with progress were already written alongside it.
+        with_progress = set(get_progress_for_problems(username, ids))
+        problems = _problem_metadata(ids)
+        return [
+            _export_row(problem_id, problems.get(problem_id, {}), {}, note.get("note_text", ""))
+            for problem_id, note in zip(ids, batch)
+            if problem_id not in with_progress
+        ]
+
+    sources = (
+        (progress_collection.find({"username": username}, {"problem_id": 1, "solved": 1, "solved_at": 1, "revised": 1, "_id": 0}, batch_size=batch_size), progress_batch),
+        (notes_collection.find({"username": username, "note_text": {"$nin": ["", None]}}, {"problem_id": 1, "note_text": 1, "_id": 0}, batch_size=batch_size), notes_batch),
+    )
+    for cursor, build in sources:
+        batch = []
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                rows = build(batch)
+                if rows:
+                    yield rows
+                batch = []
+        if batch:
+            rows = build(batch)
+            if rows:
+                yield rows
+
+def _to_text(value):
+    return value.isoformat() if isinstance(value, datetime.datetime) else value
+
+def write_export(username, fmt, handle, batch_size=BATCH_SIZE):
+    """Streams a user's export into a binary file handle chunk by chunk; returns the number of rows."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    rows_written = 0
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([
+            ("problem_id", pa.string()), ("key", pa.string()), ("name", pa.string()), ("link", pa.string()),
+            ("difficulty", pa.string()), ("solved", pa.bool_()), ("solved_at", pa.timestamp("ms", tz="UTC")),
+            ("revised", pa.bool_()), ("note_text", pa.string()),
+        ])
+        with pq.ParquetWriter(handle, schema) as writer:
+            for rows in iter_export_batches(username, batch_size):
+                for row in rows:
+                    if isinstance(row["difficulty"], (int, float)):
+                        row["difficulty"] = str(row["difficulty"])
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                rows_written += len(rows)
+        return rows_written
+
+    text = io.TextIOWrapper(handle, encoding="utf-8", newline="")
+    try:
+        if fmt == "csv":
+            writer = csv.DictWriter(text, fieldnames=EXPORT_COLUMNS)
+            writer.writeheader()
+        for rows in iter_export_batches(username, batch_size):
+            if fmt == "csv":
+                writer.writerows({column: _to_text(row[column]) for column in EXPORT_COLUMNS} for row in rows)
+            else:
+                text.writelines(json.dumps({column: _to_text(row[column]) for column in EXPORT_COLUMNS}) + "\n" for row in rows)
+            rows_written += len(rows)
+    finally:
+        # Leave the caller's handle open; only the text layer is released.
+        text.flush()
+        text.detach()
+    return rows_written
+
+# --- Import ---
+def iter_import_batches(fmt, handle, batch_size=BATCH_SIZE):
+    """Yields lists of raw rows from a binary file handle without reading it whole."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        for record_batch in pq.ParquetFile(handle).iter_batches(batch_size=batch_size):
+            yield record_batch.to_pylist()
+        return
+
+    text = io.TextIOWrapper(handle, encoding="utf-8", newline="")
+    try:
+        lines = csv.DictReader(text) if fmt == "csv" else (json.loads(line) for line in text if line.strip())
+        batch = []
+        for row in lines:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    finally:
+        text.detach()
+
+def _parse_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes")
+    return bool(value)
+
+def _parse_datetime(value):
+    if isinstance(value, datetime.datetime):
+        return value if value.tzinfo else value.replace(tzinfo=datetime.timezone.utc)
+    if isinstance(value, str) and value.strip():
+        parsed = datetime.datetime.fromisoformat(value.strip())
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=datetime.timezone.utc)
+    return None
+
+def _resolve_problems(rows):
+    """Maps each row to a problem in this database by id, then identity key, then name."""
+    ids = {row.get("problem_id") for row in rows if ObjectId.is_valid(row.get("problem_id") or "")}
+    by_id = {
+        str(problem["_id"]): problem
+        for problem in problems_collection.find({"_id": {"$in": [ObjectId(i) for i in ids]}}, {"key": 1, "name": 1, "difficulty": 1})
+    }
+    pending = [row for row in rows if row.get("problem_id") not in by_id]
+    keys = {row["key"] for row in pending if row.get("key")}
+    names = {row["name"] for row in pending if row.get("name")}
+    by_key, by_name = {}, {}
+    if keys or names:
+        for problem in problems_collection.find(
+            {"$or": [{"key": {"$in": list(keys)}}, {"name": {"$in": list(names)}}]}, {"key": 1, "name": 1, "difficulty": 1}
+        ):
+            by_key.setdefault(problem.get("key"), problem)
+            by_name.setdefault(problem.get("name"), problem)
+    return [
+        by_id.get(row.get("problem_id")) or by_key.get(row.get("key") or None) or by_name.get(row.get("name") or None)
+        for row in rows
+    ]
+
+def import_batch(username, rows):
+    """Restores one batch of rows: progress through apply_progress_changes and notes through one bulk_write."""
+    problems = _resolve_problems(rows)
+    # A problem listed twice in a batch keeps its last row, so counters are only adjusted once.
+    matched = list({str(problem["_id"]): (row, problem) for row, problem in zip(rows, problems) if problem is not None}.values())
+
+    changes, note_operations = [], []
+    now = time.time()
+    for row, problem in matched:
+        change = {
+            "problem_id": str(problem["_id"]),
+            "difficulty": problem.get("difficulty"),
+            "solved": _parse_bool(row.get("solved")),
+            "revised": _parse_bool(row.get("revised")),
+            "solved_at": _parse_datetime(row.get("solved_at")),
+        }
+        changes.append(change)
+        if row.get("note_text"):
+            note_operations.append(UpdateOne(
+                {"username": username, "problem_id": problem["_id"]},
+                {"$set": {"note_text": row["note_text"], "_ts": now}},
+                upsert=True,
+            ))
+
+    progress_written = apply_progress_changes(username, changes)
+    if note_operations:
+        notes_collection.bulk_write(note_operations, ordered=False)
+    unmatched = sum(problem is None for problem in problems)
+    return {"rows": len(rows), "progress": progress_written, "notes": len(note_operations), "unmatched": unmatched}
+
+def import_records(username, fmt, handle, batch_size=BATCH_SIZE, on_progress=None):
+    """Restores a backup batch by batch and returns the summed counts."""
+    summary = {"rows": 0, "progress": 0, "notes": 0, "unmatched": 0}
+    for rows in iter_import_batches(fmt, handle, batch_size):
+        for field, count in import_batch(username, rows).items():
+            summary[field] += count
+        if on_progress:
+            on_progress(summary)
+    return summary
+
+def format_from_path(path):
+    """Infers the backup format from a file name's extension."""
+    extension = os.path.splitext(path)[1].lstrip(".").lower()
+    return {"json": "jsonl", "ndjson": "jsonl", "pq": "parquet"}.get(extension, extension)
+
+def main():
+    """Command-line entry point for exporting or restoring a user's progress and notes."""
+    parser = argparse.ArgumentParser(description="Export or import a user's progress and notes.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export")
+    export_parser.add_argument("--username", required=True)
+    export_parser.add_argument("--output", required=True)
+    export_parser.add_argument("--format", choices=FORMATS, help="Defaults to the output file's extension.")
+    import_parser = subparsers.add_parser("import")
+    import_parser.add_argument("--username", required=True)
+    import_parser.add_argument("--input", required=True)
+    import_parser.add_argument("--format", choices=FORMATS, help="Defaults to the input file's extension.")
+    for subparser in (export_parser, import_parser):
+        subparser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        fmt = args.format or format_from_path(args.output)
+        if fmt not in FORMATS:
+            parser.error(f"cannot infer a format from {args.output}; pass --format")
+        with open(args.output, "wb") as handle:
+            count = write_export(args.username, fmt, handle, args.batch_size)
+        print(f"Exported {count} rows to {args.output}")
+    else:
+        fmt = args.format or format_from_path(args.input)
+        if fmt not in FORMATS:
+            parser.error(f"cannot infer a format from {args.input}; pass --format")
+        with open(args.input, "rb") as handle:
+            summary = import_records(
+                args.username, fmt, handle, args.batch_size,
+                on_progress=lambda s: print(f"{s['rows']} rows processed", flush=True),
+            )
+        print(f"Progress: {summary['progress']}  Notes: {summary['notes']}  Unmatched: {summary['unmatched']}")
+
+if __name__ == "__main__":
+    main()
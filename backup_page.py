@@ -0,0 +1,49 @@
+# backup_page.py
+
+import tempfile
+import streamlit as st
+from backup import FORMATS, format_from_path, write_export, import_records
+
+MIME_TYPES = {"csv": "text/csv", "jsonl": "application/jsonl", "parquet": "application/vnd.apache.parquet"}
+
+def backup_page():
+    st.title("💾 Backup & Restore")
+    username = st.session_state.username
+
+    # --- Export ---
+    st.subheader("Export")
+    st.write("Download your progress and notes, with each problem's name, link and difficulty.")
+    fmt = st.selectbox("Format", options=FORMATS, format_func=lambda x: {"csv": "CSV", "jsonl": "JSON Lines", "parquet": "Parquet"}[x])
+    if st.button("Prepare Export", type="primary"):
+        # Rows are streamed to a temporary file in batches rather than built up in memory, and the
+        # file goes straight to the download button; nothing is kept in session state, so the
+        # download is only offered on the run that prepared it.
+        with tempfile.TemporaryFile() as handle:
+            count = write_export(username, fmt, handle)
+            handle.seek(0)
+            st.download_button(
+                f"⬇️ Download {count} rows", data=handle.read(),
+                file_name=f"{username}-progress.{fmt}", mime=MIME_TYPES[fmt],
+            )
+        st.caption(
+            "Streamlit holds the prepared file in server memory while the download is offered. "
+            "For very large histories, export from the command line with `python backup.py export` instead."
+        )
+
+    st.divider()
+
+    # --- Import ---
+    st.subheader("Import")
+    st.write("Restore a backup. Problems are matched by id, then by link, then by name; progress in the file replaces yours for those problems.")
+    uploaded = st.file_uploader("Backup file", type=["csv", "jsonl", "json", "parquet"])
+    if uploaded and st.button("Import Backup"):
+        progress_bar = st.progress(0.0, text="Importing...")
+        summary = import_records(
+            username, format_from_path(uploaded.name), uploaded,
+            on_progress=lambda s: progress_bar.progress(min(uploaded.tell() / max(uploaded.size, 1), 1.0), text=f"Imported {s['rows']} rows..."),
+        )
+        progress_bar.progress(1.0, text="Import complete!")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Progress Updated", summary["progress"])
+        col2.metric("Notes Restored", summary["notes"])
+        col3.metric("Unmatched Rows", summary["unmatched"])
@@ -0,0 +1,450 @@
+# benchmark.py
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+TOPICS = [
+    "Array", "String", "Hash Table", "Dynamic Programming", "Math", "Sorting", "Greedy", "Depth-First Search",
+    "Binary Search", "Breadth-First Search", "Tree", "Matrix", "Two Pointers", "Bit Manipulation", "Stack",
+    "Heap (Priority Queue)", "Graph", "Sliding Window", "Backtracking", "Linked List", "Trie", "Union Find",
+]
+COMPANIES = [
+    "Google", "Amazon", "Microsoft", "Meta", "Apple", "Bloomberg", "Uber", "Adobe", "Oracle", "Salesforce",
+    "Goldman Sachs", "Flipkart", "Walmart", "Atlassian", "Netflix", "LinkedIn", "TikTok", "Airbnb",
+]
+WORDS = [
+    "two", "sum", "longest", "substring", "palindrome", "merge", "intervals", "tree", "path", "maximum",
+    "minimum", "window", "island", "count", "valid", "parentheses", "median", "sorted", "arrays", "kth",
+    "largest", "element", "cache", "design", "graph", "clone", "word", "ladder", "search", "rotate",
+]
+
+# Pages driven through AppTest: name -> (module, function, extra session state)
+PAGES = {
+    "problem_list": ("problem_list_page", "problem_list_page", {}),
+    "problem_list_grid": ("problem_list_page", "problem_list_page", {"problem_list_view_mode": "Grid"}),
+    "coding_history": ("coding_history_page", "coding_history_page", {}),
+    "account_info": ("account_info_page", "account_info_page", {}),
+}
+
+# --- Data Generation ---
+def generate_data(db, problems, users, progress_per_user, heavy_user_progress, notes_per_user, seed=0, batch_size=10000):
+    """Fills db with a synthetic catalog, users, progress, activity rollups and notes."""
+    from bson import ObjectId
+    from activity import difficulty_key
+
+    rng = random.Random(seed)
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+    def insert(collection, docs):
+        for start in range(0, len(docs), batch_size):
+            collection.insert_many(docs[start:start + batch_size], ordered=False)
+
+    problem_docs = []
+    for index in range(problems):
+        slug = "-".join(rng.sample(WORDS, rng.randint(2, 4))) + f"-{index}"
+        problem_docs.append({
+            "_id": ObjectId(),
+            "name": slug.replace("-", " ").title(),
+            "link": f"https://leetcode.com/problems/{slug}/",
+            "difficulty": rng.choice(DIFFICULTIES),
+            "acceptance": round(rng.uniform(15, 85), 1),
+            "company_tag": rng.sample(COMPANIES, rng.randint(1, 3)),
+            "topics": rng.sample(TOPICS, rng.randint(1, 4)),
+            "updated_at": now,
+        })
+    insert(db.problems, problem_docs)
+    db.meta.update_one({"_id": "catalog"}, {"$inc": {"version": 1}}, upsert=True)
+
+    usernames = [f"bench_user_{index}" for index in range(users)]
+    for offset in range(0, users, 1000):
+        user_docs, progress_docs, activity_docs, note_docs = [], [], [], []
+        for username in usernames[offset:offset + 1000]:
+            size = heavy_user_progress if username == usernames[0] else progress_per_user
+            picked = rng.sample(problem_docs, min(size, len(problem_docs)))
+            days = {}
+            solved = revised = 0
+            for problem in picked:
+                is_solved = rng.random() < 0.8
+                is_revised = rng.random() < 0.3
+                solved_at = now - datetime.timedelta(days=rng.randint(0, 400), minutes=rng.randint(0, 1440)) if is_solved else None
+                progress_docs.append({
+                    "username": username, "problem_id": str(problem["_id"]),
+                    "solved": is_solved, "solved_at": solved_at, "revised": is_revised,
+                })
+                solved += is_solved
+                revised += is_revised
+                if solved_at:
+                    day = days.setdefault(solved_at.strftime("%Y-%m-%d"), {"count": 0, "difficulty": {}})
+                    key = difficulty_key(problem["difficulty"])
+                    day["count"] += 1
+                    day["difficulty"][key] = day["difficulty"].get(key, 0) + 1
+            for problem in picked[:notes_per_user]:
+                note_docs.append({"username": username, "problem_id": problem["_id"], "note_text": "Remember the edge cases."})
+            activity_docs += [{"username": username, "date": date, **rollup} for date, rollup in days.items()]
+            user_docs.append({"username": username, "password": "!", "stats": {"solved": solved, "revised": revised}})
+        insert(db.users, user_docs)
+        insert(db.progress, progress_docs)
+        insert(db.activity, activity_docs)
+        insert(db.notes, note_docs)
+    return usernames
+
+def write_sync_csv(path, rows, seed=0):
+    """Writes a company CSV with `rows` problems in the layout the upload page expects."""
+    import csv
+
+    rng = random.Random(seed)
+    with open(path, "w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["Title", "Link", "Difficulty", "Acceptance", "Topics"])
+        for index in range(rows):
+            slug = "-".join(rng.sample(WORDS, 3)) + f"-csv-{index}"
+            writer.writerow([
+                slug.replace("-", " ").title(), f"https://leetcode.com/problems/{slug}/", rng.choice(DIFFICULTIES),
+                f"{rng.uniform(15, 85):.1f}%", ", ".join(rng.sample(TOPICS, rng.randint(1, 4))),
+            ])
+
+# --- Measurement ---
+def _make_command_counter():
+    """Registers a global pymongo listener that counts started commands."""
+    from pymongo import monitoring
+
+    class CommandCounter(monitoring.CommandListener):
+        def __init__(self):
+            self.count = 0
+
+        def started(self, event):
+            self.count += 1
+
+        def succeeded(self, event):
+            pass
+
+        def failed(self, event):
+            pass
+
+    counter = CommandCounter()
+    monitoring.register(counter)
+    return counter
+
+def _page_script(module_name, function_name):
+    """AppTest script body: renders one page function."""
+    import importlib
+    getattr(importlib.import_module(module_name), function_name)()
+
+def bench_page(name, username, reruns, counter):
+    """Drives a page through AppTest and records wall time, DB commands and peak memory per rerun."""
+    from streamlit.testing.v1 import AppTest
+
+    module_name, function_name, state = PAGES[name]
+    app = AppTest.from_function(_page_script, args=(module_name, function_name), default_timeout=600)
+    app.session_state["username"] = username
+    for key, value in state.items():
+        app.session_state[key] = value
+
+    results = []
+    for rerun in range(reruns + 2):
+        # The final pass repeats the rerun under tracemalloc, which would distort the timings.
+        measure_memory = rerun == reruns + 1
+        if measure_memory:
+            tracemalloc.start()
+        commands_before = counter.count if counter else None
+        started = time.perf_counter()
+        app.run()
+        wall_ms = (time.perf_counter() - started) * 1000
+        if app.exception:
+            raise RuntimeError(f"{name} raised: {app.exception[0].message}")
+        if measure_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results.append({"page": name, "pass": "memory", "peak_memory_kb": round(peak / 1024)})
+        else:
+            results.append({
+                "page": name, "pass": "cold" if rerun == 0 else "warm", "rerun": rerun,
+                "wall_ms": round(wall_ms, 2),
+                "db_commands": counter.count - commands_before if counter else None,
+            })
+    return results
+
+def bench_sync(rows, counter):
+    """Times a headless sync of a generated company CSV."""
+    from database import problems_collection
+    from sync_engine import sync_csv
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "company.csv")
+        write_sync_csv(path, rows)
+        mapping = {"problem_col": "Title", "link_col": "Link", "difficulty_col": "Difficulty", "acceptance_col": "Acceptance", "topic_col": "Topics"}
+        results = []
+        for label in ("initial", "resync"):
+            commands_before = counter.count if counter else None
+            tracemalloc.start()
+            started = time.perf_counter()
+            summary = sync_csv(path, problems_collection, mapping, "BenchCorp")
+            wall_ms = (time.perf_counter() - started) * 1000
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results.append({
+                "page": "upload_sync", "pass": label, "rows": rows, "wall_ms": round(wall_ms, 2),
+                "db_commands": counter.count - commands_before if counter else None,
+                "peak_memory_kb": round(peak / 1024), "summary": summary,
+            })
+    return results
+
+def bench_recommend(username, reruns, counter):
+    """Times recommendations for one user: a cold pass that encodes the catalog, then warm passes."""
+    from recommender import recommend_problems
+
+    results = []
+    for run in range(reruns + 1):
+        commands_before = counter.count if counter else None
+        started = time.perf_counter()
+        recommend_problems(username)
+        results.append({
+            "page": "recommend", "pass": "cold" if run == 0 else "warm", "rerun": run,
+            "wall_ms": round((time.perf_counter() - started) * 1000, 2),
+            "db_commands": counter.count - commands_before if counter else None,
+        })
+    return results
+
+def bench_login(users, attempts, concurrency, counter):
+    """Measures logins per second with `concurrency` threads signing in at once.
+
+    "login" goes through auth_service's process pool; "login_inline" verifies on the
+    calling threads like the app used to, as a baseline on the same machine.
+    """
+    import auth_service
+    from concurrent.futures import ThreadPoolExecutor
+    from streamlit.testing.v1 import AppTest
+    from database import users_collection
+    from utility import verify_password
+
+    # In the app the pool is first started from inside a script run, where __main__ is the
+    # page script; render the login form first so the workers start under the same conditions.
+    auth_service.shutdown()
+    app = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"), default_timeout=60).run()
+    if app.exception:
+        raise RuntimeError(f"login form failed to render: {app.exception}")
+
+    password = "bench-password"
+    usernames = [f"bench_login_{index}" for index in range(users)]
+    users_collection.delete_many({"username": {"$in": usernames}})
+    # One hash at the configured work factor is shared; only verification is being measured.
+    password_hash = auth_service.hash_password(password)
+    users_collection.insert_many([{"username": username, "password": password_hash} for username in usernames])
+
+    def inline_login(username):
+        user = users_collection.find_one({"username": username}, {"password": 1})
+        return auth_service.OK if user and verify_password(user["password"], password) else auth_service.INVALID
+
+    modes = {
+        "login": lambda username: auth_service.authenticate(username, password)[0],
+        "login_inline": inline_login,
+    }
+    results = []
+    for page, login in modes.items():
+        login(usernames[0])  # Starts the worker processes outside the measurement.
+
+        def attempt(index):
+            started = time.perf_counter()
+            status = login(usernames[index % users])
+            return status, (time.perf_counter() - started) * 1000
+
+        commands_before = counter.count if counter else None
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(attempt, range(attempts)))
+        wall_s = time.perf_counter() - started
+        latencies = sorted(latency for _, latency in outcomes)
+        succeeded = sum(status == auth_service.OK for status, _ in outcomes)
+        results.append({
+            "page": page, "pass": "warm", "rerun": 0, "wall_ms": round(wall_s * 1000, 2),
+            "db_commands": counter.count - commands_before if counter else None,
+            "logins_per_sec": round(succeeded / wall_s, 1), "succeeded": succeeded, "attempts": attempts,
+            "concurrency": concurrency, "workers": auth_service.POOL_WORKERS,
+            "p50_ms": round(latencies[len(latencies) // 2], 2), "p95_ms": round(latencies[int(len(latencies) * 0.95)], 2),
+        })
+    auth_service.shutdown()
+    users_collection.delete_many({"username": {"$in": usernames}})
+    return results
+
+STARTUP_SCRIPT = """
+import json, os, sys, time
+sys.path.insert(0, os.getcwd())
+started = time.perf_counter()
+import Home, database, utility, instrumentation
+imported = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("app.py", default_timeout=60)
+render_started = time.perf_counter()
+app.run()
+rendered = time.perf_counter()
+assert not app.exception and any(field.label == "Username" for field in app.text_input), "login form did not render"
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "first_render_ms": (rendered - render_started) * 1000,
+    "heavy_modules_loaded": sorted(m for m in ("pandas", "plotly", "bs4", "requests") if m in sys.modules),
+}))
+"""
+
+def bench_startup(runs):
+    """Measures cold import time and time to first render of the login form in fresh interpreters."""
+    results = []
+    for run in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", STARTUP_SCRIPT], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout
+        measured = json.loads(output.strip().splitlines()[-1])
+        results.append({
+            "page": "startup", "pass": "warm", "rerun": run, "wall_ms": round(measured["first_render_ms"], 2),
+            "import_ms": round(measured["import_ms"], 2), "db_commands": None,
+            "heavy_modules_loaded": measured["heavy_modules_loaded"],
+        })
+    return results
+
+def summarize(results):
+    """Returns per-page median warm wall time, median DB commands and peak memory."""
+    summary = {}
+    for result in results:
+        page = summary.setdefault(result["page"], {"wall_ms": [], "db_commands": [], "import_ms": [], "logins_per_sec": [], "peak_memory_kb": None})
+        if result["pass"] in ("warm", "initial", "resync"):
+            page["wall_ms"].append(result["wall_ms"])
+            if result.get("logins_per_sec") is not None:
+                page["logins_per_sec"].append(result["logins_per_sec"])
+            if result.get("import_ms") is not None:
+                page["import_ms"].append(result["import_ms"])
+            if result.get("db_commands") is not None:
+                page["db_commands"].append(result["db_commands"])
+        if result.get("peak_memory_kb") is not None:
+            page["peak_memory_kb"] = max(page["peak_memory_kb"] or 0, result["peak_memory_kb"])
+    return {
+        name: {
+            "median_wall_ms": round(statistics.median(page["wall_ms"]), 2) if page["wall_ms"] else None,
+            "median_db_commands": statistics.median(page["db_commands"]) if page["db_commands"] else None,
+            "peak_memory_kb": page["peak_memory_kb"],
+            **({"median_import_ms": round(statistics.median(page["import_ms"]), 2)} if page["import_ms"] else {}),
+            **({"median_logins_per_sec": statistics.median(page["logins_per_sec"])} if page["logins_per_sec"] else {}),
+        }
+        for name, page in summary.items()
+    }
+
+def compare(report, baseline_path):
+    """Prints per-page changes against a previous report."""
+    with open(baseline_path) as handle:
+        baseline = json.load(handle)["summary"]
+    for name, current in report["summary"].items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric in ("median_wall_ms", "median_db_commands", "peak_memory_kb", "median_import_ms", "median_logins_per_sec"):
+            before, after = previous.get(metric), current.get(metric)
+            if before and after is not None:
+                print(f"{name:20} {metric:20} {before:>10} -> {after:>10} ({(after - before) / before:+.1%})")
+
+def _git_commit():
+    """Returns the current commit hash, if the tree is a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    """Command-line entry point: generate data, benchmark every page, write a JSON report."""
+    parser = argparse.ArgumentParser(description="Benchmark every page against a synthetic data set.")
+    parser.add_argument("--uri", default="mongodb://localhost:27017", help="Local mongod to benchmark against.")
+    parser.add_argument("--mongomock", action="store_true", help="Use an in-process mongomock database (small sizes only; no command counts). Needs requirements-dev.txt.")
+    parser.add_argument("--db", default="codetrack_bench")
+    parser.add_argument("--problems", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--progress-per-user", type=int, default=300)
+    parser.add_argument("--heavy-user-progress", type=int, default=5000, help="Progress entries for the benchmarked user.")
+    parser.add_argument("--notes-per-user", type=int, default=20)
+    parser.add_argument("--sync-rows", type=int, default=20000)
+    parser.add_argument("--login-users", type=int, default=200)
+    parser.add_argument("--login-attempts", type=int, default=400)
+    parser.add_argument("--login-concurrency", type=int, default=32, help="Threads signing in at once.")
+    parser.add_argument("--reruns", type=int, default=5, help="Warm reruns per page, after one cold run.")
+    parser.add_argument("--pages", nargs="*", default=list(PAGES) + ["recommend", "upload_sync", "login", "startup"])
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="A previous report to compare against.")
+    parser.add_argument("--keep-data", action="store_true", help="Reuse existing benchmark data instead of regenerating it.")
+    args = parser.parse_args()
+    if not args.keep_data and "bench" not in args.db:
+        parser.error("refusing to wipe a database whose name does not contain 'bench'")
+    if args.reruns < 1:
+        parser.error("--reruns must be at least 1")
+
+    os.environ["MONGODB_URI"] = args.uri
+    os.environ["MONGODB_DB"] = args.db
+    counter = None
+    if args.mongomock:
+        import mongomock
+        import pymongo
+        client = mongomock.MongoClient()
+        pymongo.MongoClient = lambda *a, **k: client
+    else:
+        counter = _make_command_counter()
+
+    from database import get_database
+    db = get_database()
+
+    started = time.perf_counter()
+    if not args.keep_data:
+        for name in ("problems", "users", "progress", "activity", "notes", "meta"):
+            db[name].delete_many({})
+        usernames = generate_data(db, args.problems, args.users, args.progress_per_user, args.heavy_user_progress, args.notes_per_user)
+    else:
+        usernames = ["bench_user_0"]
+    from database import ensure_indexes
+    for index, error in ensure_indexes().items():
+        print(f"Index {index} was not built, so results will not reflect production: {error}", flush=True)
+    print(f"Data ready in {time.perf_counter() - started:.1f}s", flush=True)
+
+    results = []
+    for name in args.pages:
+        print(f"Benchmarking {name}...", flush=True)
+        if name == "upload_sync":
+            results += bench_sync(args.sync_rows, counter)
+        elif name == "recommend":
+            results += bench_recommend(usernames[0], args.reruns, counter)
+        elif name == "login":
+            results += bench_login(args.login_users, args.login_attempts, args.login_concurrency, counter)
+        elif name == "startup":
+            results += bench_startup(args.reruns)
+        else:
+            results += bench_page(name, usernames[0], args.reruns, counter)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "backend": "mongomock" if args.mongomock else "mongod",
+            "sizes": {
+                "problems": args.problems, "users": args.users, "progress_per_user": args.progress_per_user,
+                "heavy_user_progress": args.heavy_user_progress, "sync_rows": args.sync_rows,
+                "login_attempts": args.login_attempts, "login_concurrency": args.login_concurrency,
+            },
+        },
+        "results": results,
+        "summary": summarize(results),
+    }
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2, default=str)
+    print(json.dumps(report["summary"], indent=2))
+    if args.compare:
+        compare(report, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,44 @@
 # coding_history_page.py
 
 import streamlit as st
-import pandas as pd
 import datetime
 import plotly.graph_objects as go
-from database import users_collection
+from activity import load_activity
 
 def coding_history_page():
     st.title("🗓️ Your Coding History")
-    user_data = users_collection.find_one({"username": st.session_state.username})
-    user_progress = user_data.get("progress", {}) if user_data else {}
-    solve_dates = [data["solved_at"] for data in user_progress.values() if data.get("solved") and data.get("solved_at")]
+    activity = load_activity(st.session_state.username)
 
-    if not solve_dates:
+    if not activity["total"]:
         st.info("No solved problems with dates found.")
     else:
-        df = pd.DataFrame(solve_dates, columns=["solved_at"])
-        df['date'] = pd.to_datetime(df['solved_at']).dt.date
-        activity = df.groupby('date').size().reset_index(name='count').set_index('date')
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("🔥 Current Streak", f"{activity['current_streak']} days")
+        col2.metric("🏆 Longest Streak", f"{activity['longest_streak']} days")
+        col3.metric("This Week", activity["this_week"])
+        col4.metric("This Month", activity["this_month"])
 
-        all_days = pd.date_range(end=datetime.date.today(), periods=365, freq='D')
-        activity = activity.reindex(all_days, fill_value=0)
-
-        data = pd.DataFrame({'date': activity.index, 'count': activity['count']})
-        data['day_of_week'] = data['date'].dt.dayofweek
-        data['week_of_year'] = data['date'].dt.isocalendar().week
-        data.loc[(data['date'].dt.month == 1) & (data['week_of_year'] > 50), 'week_of_year'] = 0
+        # The heatmap is laid out from the fixed 365-day array: one column per week, one row per weekday.
+        start = activity["start"]
+        offset = start.weekday()
+        weeks = [(index + offset) // 7 for index in range(len(activity["counts"]))]
+        weekdays = [(index + offset) % 7 for index in range(len(activity["counts"]))]
+        dates = [(start + datetime.timedelta(days=index)).isoformat() for index in range(len(activity["counts"]))]
 
         fig = go.Figure(data=go.Heatmap(
-            z=data['count'],
-            x=data['week_of_year'],
-            y=data['day_of_week'],
+            z=activity["counts"],
+            x=weeks,
+            y=weekdays,
+            text=dates,
+            hovertemplate="%{text}: %{z} solved<extra></extra>",
             colorscale='Greens',
             showscale=False
         ))
         fig.update_layout(title_text='Problems Solved in the Last Year', height=300)
         st.plotly_chart(fig, use_container_width=True)
+
+        if activity["by_difficulty"]:
+            st.subheader("By Difficulty")
+            difficulty_cols = st.columns(len(activity["by_difficulty"]))
+            for col, (difficulty, count) in zip(difficulty_cols, activity["by_difficulty"].items()):
+                col.metric(difficulty, count)
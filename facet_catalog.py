@@ -0,0 +1,84 @@
+# facet_catalog.py
+
+import contextlib
+import streamlit as st
+import local_cache
+from database import problems_collection, meta_collection
+
+CATALOG_META_ID = "catalog"
+FACET_FIELDS = ("company_tag", "difficulty", "topics")
+
+def get_catalog_version():
+    """Returns the catalog version, which every write to the problems collection bumps."""
+    meta = meta_collection.find_one({"_id": CATALOG_META_ID}, {"version": 1})
+    return meta.get("version", 0) if meta else 0
+
+def bump_catalog_version():
+    """Marks the catalog as changed so every app instance rebuilds its cached facets."""
+    meta_collection.update_one({"_id": CATALOG_META_ID}, {"$inc": {"version": 1}}, upsert=True)
+
+def refresh_from_catalog(state, projection, apply, reset=None, rebuild_when=None, lock=None, batch_size=1000):
+    """Brings a copy of the catalog up to date and returns whether the catalog had changed.
+
+    `state` holds the catalog "version" and "watermark" (the latest updated_at read) the copy
+    was last refreshed to. Once the version moves, problems written since the watermark are
+    passed to apply() in batches. With no watermark yet, or when rebuild_when() says so, reset()
+    clears the copy and every problem is read. The watermark only advances past a batch once it
+    is applied, and the version once all of them are, so a failed refresh is picked up again.
+    """
+    version = get_catalog_version()
+    if version == state["version"]:
+        return False
+    with lock or contextlib.nullcontext():
+        if version == state["version"]:
+            return False
+        if state["version"] is None or state["watermark"] is None or (rebuild_when and rebuild_when()):
+            state["watermark"] = None
+            if reset:
+                reset()
+        # $gte re-reads writes that share the watermark timestamp, so apply() must be idempotent.
+        query = {"updated_at": {"$gte": state["watermark"]}} if state["watermark"] is not None else {}
+        batch, watermark = [], state["watermark"]
+        for problem in problems_collection.find(query, {**projection, "updated_at": 1}, batch_size=batch_size):
+            batch.append(problem)
+            updated_at = problem.get("updated_at")
+            if updated_at and (watermark is None or updated_at > watermark):
+                watermark = updated_at
+            if len(batch) >= batch_size:
+                apply(batch)
+                batch, state["watermark"] = [], watermark
+        if batch:
+            apply(batch)
+        state.update(version=version, watermark=watermark)
+    return True
+
+def _facet_pipeline(field):
+    """Returns the $facet branch counting problems per value of a field."""
+    stages = [{"$unwind": f"${field}"}] if field != "difficulty" else []
+    return stages + [
+        {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+        {"$match": {"_id": {"$ne": None}}},
+        {"$sort": {"_id": 1}},
+    ]
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def _load_facet_catalog(version):
+    """Computes values and per-value counts for every filter field in one aggregation."""
+    result = next(problems_collection.aggregate([
+        {"$facet": {field: _facet_pipeline(field) for field in FACET_FIELDS}}
+    ]), {})
+    return {
+        field: {entry["_id"]: entry["count"] for entry in result.get(field, [])}
+        for field in FACET_FIELDS
+    }
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def _load_local_facet_catalog(version):
+    """Computes the same counts from the local cache's tables."""
+    return local_cache.facet_catalog()
+
+def get_facet_catalog():
+    """Returns {field: {value: count}} for the filter dropdowns, cached per catalog version."""
+    if local_cache.enabled():
+        return _load_local_facet_catalog(local_cache.catalog_version())
+    return _load_facet_catalog(get_catalog_version())
@@ -0,0 +1,152 @@
+# instrumentation.py
+
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+import streamlit as st
+from pymongo import monitoring
+
+# Opt-in: when disabled no listener is registered and spans return immediately.
+INSTRUMENTATION_ENABLED = os.environ.get("CODETRACK_INSTRUMENT", "").lower() in ("1", "true", "yes")
+INSTRUMENTATION_LOG = os.environ.get("CODETRACK_INSTRUMENT_LOG")
+
+# Streamlit runs each rerun on its own script thread and pymongo publishes command
+# events on the thread that issued the command, so per-rerun state is thread-local.
+_local = threading.local()
+
+def _records():
+    """Returns the record list of the rerun running on this thread, if any."""
+    return getattr(_local, "records", None)
+
+def _count_docs(reply):
+    """Returns how many documents a command reply carried back."""
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", [])))
+    if "values" in reply:
+        return len(reply["values"])
+    if "n" in reply:
+        return reply["n"]
+    return None
+
+class CommandRecorder(monitoring.CommandListener):
+    """Records name, collection, duration and returned documents of each command in the current rerun."""
+
+    def started(self, event):
+        records = _records()
+        if records is None:
+            return
+        target = event.command.get(event.command_name)
+        collection = event.command.get("collection") if event.command_name == "getMore" else target
+        _local.pending[event.request_id] = {
+            "type": "command",
+            "command": event.command_name,
+            "collection": collection if isinstance(collection, str) else None,
+            "span": _local.spans[-1] if _local.spans else None,
+        }
+
+    def succeeded(self, event):
+        pending = getattr(_local, "pending", {}).pop(event.request_id, None)
+        records = _records()
+        if pending is not None and records is not None:
+            pending.update(duration_ms=event.duration_micros / 1000, docs_returned=_count_docs(event.reply))
+            records.append(pending)
+
+    def failed(self, event):
+        pending = getattr(_local, "pending", {}).pop(event.request_id, None)
+        records = _records()
+        if pending is not None and records is not None:
+            pending.update(duration_ms=event.duration_micros / 1000, docs_returned=None, failed=True)
+            records.append(pending)
+
+def command_listeners():
+    """Returns the listeners to register on the MongoClient; none when instrumentation is off."""
+    return [CommandRecorder()] if INSTRUMENTATION_ENABLED else []
+
+def start_rerun():
+    """Begins collecting records for the rerun running on this thread."""
+    if not INSTRUMENTATION_ENABLED:
+        return
+    _local.records = []
+    _local.pending = {}
+    _local.spans = []
+    _local.rerun = {"rerun_id": uuid.uuid4().hex, "started_at": time.time(), "started": time.perf_counter()}
+
+@contextmanager
+def span(name):
+    """Times a block, e.g. one page function, and tags the commands issued inside it."""
+    if not INSTRUMENTATION_ENABLED or _records() is None:
+        yield
+        return
+    _local.spans.append(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _local.spans.pop()
+        _records().append({"type": "span", "name": name, "duration_ms": (time.perf_counter() - started) * 1000})
+
+def export_jsonl(records, rerun=None):
+    """Serializes a rerun's records as JSON lines tagged with the rerun id."""
+    rerun = rerun or _local.rerun
+    lines = [
+        json.dumps({"rerun_id": rerun["rerun_id"], "started_at": rerun["started_at"], **record}, default=str)
+        for record in records
+    ]
+    return "\n".join(lines) + "\n" if lines else ""
+
+def finish_rerun():
+    """Closes this rerun's records, appends them to the log file and queues them for the panel.
+
+    Called from a finally block, so reruns cut short by st.rerun() (which every save
+    handler ends with) are logged too; the next panel shows them after its own rerun.
+    """
+    records = _records()
+    if not INSTRUMENTATION_ENABLED or records is None:
+        return
+    records = records + [{"type": "span", "name": "rerun", "duration_ms": (time.perf_counter() - _local.rerun["started"]) * 1000}]
+    _local.records = None
+    data = export_jsonl(records)
+    if INSTRUMENTATION_LOG:
+        with open(INSTRUMENTATION_LOG, "a") as handle:
+            handle.write(data)
+    finished = {"rerun_id": _local.rerun["rerun_id"], "records": records, "data": data}
+    # Session state outlives the script thread, which may differ between reruns.
+    st.session_state["_instrumentation_unshown"] = [finished] + st.session_state.get("_instrumentation_unshown", [])
+
+def _render_rerun(finished, label):
+    records = finished["records"]
+    commands = [record for record in records if record["type"] == "command"]
+    spans = [record for record in records if record["type"] == "span"]
+    with st.sidebar.expander(label):
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Rerun", f"{spans[-1]['duration_ms']:.0f} ms")
+        col2.metric("DB cmds", len(commands))
+        col3.metric("DB time", f"{sum(record['duration_ms'] for record in commands):.0f} ms")
+        st.dataframe(
+            [{"span": record["name"], "ms": round(record["duration_ms"], 1)} for record in spans],
+            hide_index=True, use_container_width=True,
+        )
+        st.dataframe(
+            [{
+                "command": record["command"], "collection": record["collection"], "span": record["span"],
+                "ms": round(record["duration_ms"], 2), "docs": record["docs_returned"],
+            } for record in commands],
+            hide_index=True, use_container_width=True,
+        )
+        st.download_button(
+            "⬇️ Export JSONL", data=finished["data"], file_name=f"rerun-{finished['rerun_id']}.jsonl",
+            mime="application/jsonl", key=f"instrumentation_export_{finished['rerun_id']}",
+        )
+
+def render_debug_panel():
+    """Shows the spans and DB commands of this rerun, and of any reruns cut short before it, in the sidebar."""
+    if not INSTRUMENTATION_ENABLED:
+        return
+    finish_rerun()
+    unshown = st.session_state.pop("_instrumentation_unshown", [])
+    for index, finished in enumerate(unshown):
+        _render_rerun(finished, "🛠️ Instrumentation" if index == 0 else "🛠️ Previous rerun (ended in st.rerun)")
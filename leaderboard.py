@@ -0,0 +1,111 @@
+# leaderboard.py
+
+import argparse
+import time
+from bson import ObjectId
+from pymongo import UpdateOne
+from database import problems_collection, users_collection, progress_collection
+
+# Points a solve is worth towards the leaderboard score, by difficulty.
+DIFFICULTY_POINTS = {"easy": 1, "medium": 2, "hard": 3}
+TOP_K = 50
+
+def solve_points(difficulty):
+    """Returns the score a solve of this difficulty is worth; unknown difficulties count as easy."""
+    return DIFFICULTY_POINTS.get(str(difficulty).strip().lower(), 1)
+
+def record_solve_stats(username, entries):
+    """Applies (problem_id, difficulty, delta) solve entries to the per-problem counters and the user's score."""
+    entries = [(problem_id, difficulty, delta) for problem_id, difficulty, delta in entries if delta]
+    if not entries:
+        return
+    operations = [
+        UpdateOne({"_id": ObjectId(problem_id)}, {"$inc": {"solve_count": delta}})
+        for problem_id, _, delta in entries
+        if ObjectId.is_valid(problem_id)
+    ]
+    if operations:
+        problems_collection.bulk_write(operations, ordered=False)
+    score = sum(solve_points(difficulty) * delta for _, difficulty, delta in entries)
+    if score:
+        users_collection.update_one({"username": username}, {"$inc": {"stats.score": score}})
+
+# --- Reads ---
+def get_top_users(limit=TOP_K):
+    """Returns the highest-scoring users, read straight off the stats.score index."""
+    return list(
+        users_collection.find({"stats.score": {"$gt": 0}}, {"username": 1, "stats.score": 1, "stats.solved": 1, "_id": 0})
+        .sort("stats.score", -1)
+        .limit(limit)
+    )
+
+def get_top_problems(limit=TOP_K):
+    """Returns the most solved problems, read straight off the solve_count index."""
+    return list(
+        problems_collection.find({"solve_count": {"$gt": 0}}, {"name": 1, "link": 1, "difficulty": 1, "solve_count": 1})
+        .sort("solve_count", -1)
+        .limit(limit)
+    )
+
+# --- Reconciliation ---
+def reconcile_solve_stats(batch_size=1000):
+    """Rebuilds every problem's solve_count and every user's score from the progress collection.
+
+    Increments can drift, e.g. after a crash between writes or edits made outside the app;
+    this recomputes both views from source and rewrites only the values that differ.
+    """
+    difficulties = {
+        str(problem["_id"]): problem.get("difficulty")
+        for problem in problems_collection.find({}, {"difficulty": 1}, batch_size=batch_size)
+    }
+    solve_counts, scores = {}, {}
+    for doc in progress_collection.find({"solved": True}, {"username": 1, "problem_id": 1, "_id": 0}, batch_size=batch_size):
+        problem_id = doc["problem_id"]
+        if problem_id in difficulties:
+            solve_counts[problem_id] = solve_counts.get(problem_id, 0) + 1
+        scores[doc["username"]] = scores.get(doc["username"], 0) + solve_points(difficulties.get(problem_id))
+
+    problem_ops = [
+        UpdateOne({"_id": ObjectId(problem_id)}, {"$set": {"solve_count": count}})
+        for problem_id, count in solve_counts.items()
+    ]
+    # Problems nobody has solved any more are reset without listing every unsolved id.
+    problem_ops += [
+        UpdateOne({"_id": problem["_id"]}, {"$set": {"solve_count": 0}})
+        for problem in problems_collection.find({"solve_count": {"$ne": 0, "$exists": True}}, {"_id": 1})
+        if str(problem["_id"]) not in solve_counts
+    ]
+    user_ops = [UpdateOne({"username": username}, {"$set": {"stats.score": score}}) for username, score in scores.items()]
+    user_ops += [
+        UpdateOne({"_id": user["_id"]}, {"$set": {"stats.score": 0}})
+        for user in users_collection.find({"stats.score": {"$ne": 0, "$exists": True}}, {"username": 1})
+        if user["username"] not in scores
+    ]
+
+    changed = 0
+    for collection, operations in ((problems_collection, problem_ops), (users_collection, user_ops)):
+        for start in range(0, len(operations), batch_size):
+            result = collection.bulk_write(operations[start:start + batch_size], ordered=False)
+            changed += result.modified_count
+    return {"problems": len(solve_counts), "users": len(scores), "changed": changed}
+
+def main():
+    """Command-line entry point for reconciling the leaderboard, once or periodically."""
+    parser = argparse.ArgumentParser(description="Rebuild per-problem solve counts and per-user scores from progress.")
+    parser.add_argument("--every", type=float, help="Keep running, reconciling every this many seconds.")
+    args = parser.parse_args()
+
+    while True:
+        started = time.perf_counter()
+        summary = reconcile_solve_stats()
+        print(
+            f"{summary['problems']} problems, {summary['users']} users, {summary['changed']} documents corrected "
+            f"in {time.perf_counter() - started:.1f}s",
+            flush=True,
+        )
+        if not args.every:
+            break
+        time.sleep(args.every)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# leaderboard_page.py
+
+import streamlit as st
+from leaderboard import get_top_users, get_top_problems, TOP_K
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _load_leaderboard():
+    """Reads the precomputed top-K users and problems, shared across sessions for a short while."""
+    return get_top_users(), get_top_problems()
+
+def leaderboard_page():
+    st.title("🏆 Leaderboard")
+    top_users, top_problems = _load_leaderboard()
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader(f"Top {TOP_K} Coders")
+        if not top_users:
+            st.info("No one has solved a problem yet.")
+        else:
+            st.dataframe(
+                [{
+                    "Rank": rank,
+                    "User": ("⭐ " if user["username"] == st.session_state.username else "") + user["username"],
+                    "Score": user["stats"]["score"],
+                    "Solved": user["stats"].get("solved", 0),
+                } for rank, user in enumerate(top_users, start=1)],
+                hide_index=True, use_container_width=True,
+            )
+        st.caption("Easy solves score 1 point, Medium 2 and Hard 3.")
+
+    with col2:
+        st.subheader(f"Top {TOP_K} Most Solved Problems")
+        if not top_problems:
+            st.info("No problems have been solved yet.")
+        else:
+            st.dataframe(
+                [{
+                    "Problem": problem.get("name", "Unnamed Problem"),
+                    "Difficulty": str(problem.get("difficulty", "")).title(),
+                    "Solved By": problem["solve_count"],
+                    "Link": problem.get("link", "#"),
+                } for problem in top_problems],
+                hide_index=True, use_container_width=True,
+                column_config={"Link": st.column_config.LinkColumn("Link", display_text="Open")},
+            )
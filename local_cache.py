@@ -0,0 +1,402 @@
+# local_cache.py
+
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+from bson import ObjectId
+import pymongo
+import database
+from database import check_db_connection
+
+# --- Settings ---
+# Opt-in: set CODETRACK_LOCAL_CACHE to a SQLite file path to serve reads locally and queue writes.
+LOCAL_CACHE_PATH = os.environ.get("CODETRACK_LOCAL_CACHE")
+FLUSH_INTERVAL = float(os.environ.get("CODETRACK_FLUSH_INTERVAL", "5"))
+FLUSH_BATCH_SIZE = int(os.environ.get("CODETRACK_FLUSH_BATCH_SIZE", "500"))
+PRIME_TTL = float(os.environ.get("CODETRACK_PRIME_TTL", "300"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS problems (id TEXT PRIMARY KEY, name TEXT, difficulty TEXT, doc TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS problems_name ON problems (name);
+CREATE INDEX IF NOT EXISTS problems_difficulty ON problems (difficulty, name);
+CREATE TABLE IF NOT EXISTS problem_companies (company TEXT, id TEXT, PRIMARY KEY (company, id));
+CREATE TABLE IF NOT EXISTS problem_topics (topic TEXT, id TEXT, PRIMARY KEY (topic, id));
+CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS progress (
+    username TEXT, problem_id TEXT, solved INTEGER, solved_at TEXT, revised INTEGER,
+    PRIMARY KEY (username, problem_id)
+);
+CREATE TABLE IF NOT EXISTS notes (username TEXT, problem_id TEXT, note_text TEXT, PRIMARY KEY (username, problem_id));
+CREATE TABLE IF NOT EXISTS users (username TEXT PRIMARY KEY, password TEXT);
+CREATE TABLE IF NOT EXISTS outbox (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT, username TEXT, problem_id TEXT, field TEXT, value TEXT, ts REAL
+);
+"""
+
+_lock = threading.RLock()
+_state = {"conn": None, "flusher": None, "primed": {}}
+_wake = threading.Event()
+
+def enabled():
+    """Returns whether the local cache is configured."""
+    return bool(LOCAL_CACHE_PATH)
+
+def _conn():
+    """Returns the process-wide SQLite connection, creating the schema on first use."""
+    if _state["conn"] is None:
+        with _lock:
+            if _state["conn"] is None:
+                conn = sqlite3.connect(LOCAL_CACHE_PATH, check_same_thread=False, isolation_level=None)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.executescript(SCHEMA)
+                _state["conn"] = conn
+    return _state["conn"]
+
+def _get_state(key):
+    row = _conn().execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+def _set_state(key, value):
+    _conn().execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, value))
+
+def _to_iso(value):
+    return value.isoformat() if isinstance(value, datetime.datetime) else None
+
+def _from_iso(value):
+    return datetime.datetime.fromisoformat(value) if value else None
+
+# --- Catalog ---
+def _store_problems(problems):
+    """Writes problem documents and their company/topic rows in one transaction."""
+    conn = _conn()
+    with _lock:
+        conn.execute("BEGIN")
+        try:
+            for problem in problems:
+                problem_id = str(problem["_id"])
+                doc = {key: problem.get(key) for key in ("name", "link", "difficulty", "company_tag", "topics")}
+                conn.execute(
+                    "INSERT OR REPLACE INTO problems (id, name, difficulty, doc) VALUES (?, ?, ?, ?)",
+                    (problem_id, doc["name"], doc["difficulty"], json.dumps(doc, default=str)),
+                )
+                conn.execute("DELETE FROM problem_companies WHERE id = ?", (problem_id,))
+                conn.execute("DELETE FROM problem_topics WHERE id = ?", (problem_id,))
+                conn.executemany("INSERT OR IGNORE INTO problem_companies VALUES (?, ?)", [(c, problem_id) for c in doc["company_tag"] or []])
+                conn.executemany("INSERT OR IGNORE INTO problem_topics VALUES (?, ?)", [(t, problem_id) for t in doc["topics"] or []])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+def refresh_catalog(batch_size=1000):
+    """Pulls catalog changes from MongoDB when its version moved; a no-op while offline."""
+    if not check_db_connection():
+        return False
+    from facet_catalog import refresh_from_catalog
+
+    try:
+        version = _get_state("catalog_version")
+        state = {
+            "version": int(version) if version is not None else None,
+            "watermark": _from_iso(_get_state("catalog_watermark")),
+        }
+        if refresh_from_catalog(
+            state, {"name": 1, "link": 1, "difficulty": 1, "company_tag": 1, "topics": 1}, _store_problems, batch_size=batch_size
+        ):
+            with _lock:
+                _set_state("catalog_watermark", _to_iso(state["watermark"]))
+                _set_state("catalog_version", str(state["version"]))
+        return True
+    except pymongo.errors.PyMongoError:
+        return False
+
+def catalog_version():
+    """Returns the catalog version the local copy was last refreshed to."""
+    return _get_state("catalog_version")
+
+def _where(query):
+    """Translates the problem list's MongoDB filter into SQL over the local tables."""
+    clauses, params = [], []
+    if "company_tag" in query:
+        clauses.append("id IN (SELECT id FROM problem_companies WHERE company = ?)")
+        params.append(query["company_tag"])
+    if "difficulty" in query:
+        clauses.append("difficulty = ?")
+        params.append(query["difficulty"])
+    for topic in query.get("topics", {}).get("$all", []):
+        clauses.append("id IN (SELECT id FROM problem_topics WHERE topic = ?)")
+        params.append(topic)
+    if "_id" in query:
+        ids = [str(problem_id) for problem_id in query["_id"].get("$in", [])]
+        clauses.append(f"id IN ({','.join('?' * len(ids)) or 'NULL'})")
+        params += ids
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+def count_problems(query):
+    """Counts local problems matching a problem list filter."""
+    where, params = _where(query)
+    return _conn().execute(f"SELECT COUNT(*) FROM problems{where}", params).fetchone()[0]
+
+def _problem_from_row(problem_id, doc):
+    return {"_id": ObjectId(problem_id), **json.loads(doc)}
+
+def fetch_problem_page(query, page_num, per_page):
+    """Fetches one page of local problems sorted by name."""
+    where, params = _where(query)
+    rows = _conn().execute(
+        f"SELECT id, doc FROM problems{where} ORDER BY name LIMIT ? OFFSET ?", params + [per_page, (page_num - 1) * per_page]
+    ).fetchall()
+    return [_problem_from_row(problem_id, doc) for problem_id, doc in rows]
+
+def fetch_problems_by_id(problem_ids):
+    """Returns {id: problem} for local problems with the given ids."""
+    ids = [str(problem_id) for problem_id in problem_ids]
+    if not ids:
+        return {}
+    rows = _conn().execute(f"SELECT id, doc FROM problems WHERE id IN ({','.join('?' * len(ids))})", ids).fetchall()
+    return {ObjectId(problem_id): _problem_from_row(problem_id, doc) for problem_id, doc in rows}
+
+def facet_catalog():
+    """Returns {field: {value: count}} for the filter dropdowns from the local tables."""
+    conn = _conn()
+    return {
+        "company_tag": dict(conn.execute("SELECT company, COUNT(*) FROM problem_companies GROUP BY company ORDER BY company")),
+        "difficulty": dict(conn.execute("SELECT difficulty, COUNT(*) FROM problems WHERE difficulty IS NOT NULL GROUP BY difficulty ORDER BY difficulty")),
+        "topics": dict(conn.execute("SELECT topic, COUNT(*) FROM problem_topics GROUP BY topic ORDER BY topic")),
+    }
+
+# --- User Data ---
+def prime_user(username):
+    """Replaces the local copy of a user's progress and notes with MongoDB's, keeping unflushed local writes."""
+    if time.monotonic() - _state["primed"].get(username, float("-inf")) < PRIME_TTL or not check_db_connection():
+        return
+    try:
+        progress = list(database.progress_collection.find(
+            {"username": username}, {"problem_id": 1, "solved": 1, "solved_at": 1, "revised": 1, "_id": 0}
+        ))
+        notes = list(database.notes_collection.find(
+            {"username": username, "note_text": {"$nin": ["", None]}}, {"problem_id": 1, "note_text": 1, "_id": 0}
+        ))
+    except pymongo.errors.PyMongoError:
+        return
+
+    conn = _conn()
+    with _lock:
+        conn.execute("BEGIN")
+        try:
+            conn.execute("DELETE FROM progress WHERE username = ?", (username,))
+            conn.execute("DELETE FROM notes WHERE username = ?", (username,))
+            conn.executemany("INSERT INTO progress VALUES (?, ?, ?, ?, ?)", [
+                (username, doc["problem_id"], int(bool(doc.get("solved"))), _to_iso(doc.get("solved_at")), int(bool(doc.get("revised"))))
+                for doc in progress
+            ])
+            conn.executemany("INSERT INTO notes VALUES (?, ?, ?)", [
+                (username, str(doc["problem_id"]), doc["note_text"]) for doc in notes
+            ])
+            # Writes still waiting in the outbox are newer than what MongoDB has.
+            for kind, problem_id, field, value in conn.execute(
+                "SELECT kind, problem_id, field, value FROM outbox WHERE username = ? ORDER BY seq", (username,)
+            ).fetchall():
+                _apply_local(kind, username, problem_id, field, json.loads(value))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    _state["primed"][username] = time.monotonic()
+
+def get_progress(username, problem_ids):
+    """Returns {problem_id: progress} for the given problem id strings from the local copy."""
+    ids = list(problem_ids)
+    if not ids:
+        return {}
+    rows = _conn().execute(
+        f"SELECT problem_id, solved, solved_at, revised FROM progress WHERE username = ? AND problem_id IN ({','.join('?' * len(ids))})",
+        [username] + ids,
+    ).fetchall()
+    return {
+        problem_id: {"solved": bool(solved), "solved_at": _from_iso(solved_at), "revised": bool(revised)}
+        for problem_id, solved, solved_at, revised in rows
+    }
+
+def get_noted_ids(username, problem_ids):
+    """Returns the subset of problem id strings the user has a non-empty note for."""
+    ids = list(problem_ids)
+    if not ids:
+        return set()
+    rows = _conn().execute(
+        f"SELECT problem_id FROM notes WHERE username = ? AND note_text != '' AND problem_id IN ({','.join('?' * len(ids))})",
+        [username] + ids,
+    ).fetchall()
+    return {row[0] for row in rows}
+
+def get_note(username, problem_id):
+    """Returns the user's local note text for a problem."""
+    row = _conn().execute("SELECT note_text FROM notes WHERE username = ? AND problem_id = ?", (username, problem_id)).fetchone()
+    return row[0] if row else ""
+
+def remember_user(username, password_hash):
+    """Stores a user's password hash so they can sign in while MongoDB is unreachable."""
+    with _lock:
+        _conn().execute("INSERT OR REPLACE INTO users (username, password) VALUES (?, ?)", (username, password_hash))
+
+def get_user_password(username):
+    """Returns the cached password hash for a user, if they have signed in here before."""
+    row = _conn().execute("SELECT password FROM users WHERE username = ?", (username,)).fetchone()
+    return row[0] if row else None
+
+# --- Write-Behind Queue ---
+def _apply_local(kind, username, problem_id, field, value):
+    """Applies one queued write to the local tables."""
+    conn = _conn()
+    if kind == "note":
+        conn.execute("INSERT OR REPLACE INTO notes VALUES (?, ?, ?)", (username, problem_id, value["value"]))
+        return
+    conn.execute("INSERT OR IGNORE INTO progress VALUES (?, ?, 0, NULL, 0)", (username, problem_id))
+    if field == "solved":
+        conn.execute(
+            "UPDATE progress SET solved = ?, solved_at = ? WHERE username = ? AND problem_id = ?",
+            (int(value["value"]), value.get("solved_at"), username, problem_id),
+        )
+    else:
+        conn.execute("UPDATE progress SET revised = ? WHERE username = ? AND problem_id = ?", (int(value["value"]), username, problem_id))
+
+def _enqueue(entries):
+    """Durably records writes locally and in the outbox, then wakes the flusher."""
+    ts = time.time()
+    conn = _conn()
+    with _lock:
+        conn.execute("BEGIN")
+        try:
+            for kind, username, problem_id, field, value in entries:
+                _apply_local(kind, username, problem_id, field, value)
+                conn.execute(
+                    "INSERT INTO outbox (kind, username, problem_id, field, value, ts) VALUES (?, ?, ?, ?, ?, ?)",
+                    (kind, username, problem_id, field, json.dumps(value), ts),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    start_flusher()
+    _wake.set()
+
+def _progress_entries(username, problem_id, fields, difficulty):
+    """Builds outbox entries for a set of progress field changes."""
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    entries = []
+    for field, value in fields.items():
+        payload = {"value": value}
+        if field == "solved":
+            payload.update(solved_at=now if value else None, difficulty=difficulty)
+        entries.append(("progress", username, problem_id, field, payload))
+    return entries
+
+def queue_progress(username, problem_id, fields, difficulty=None):
+    """Queues progress field changes, e.g. {"solved": True}, for one problem."""
+    _enqueue(_progress_entries(username, problem_id, fields, difficulty))
+
+def queue_progress_changes(username, changes):
+    """Queues a batch of grid edits in one local transaction."""
+    entries = []
+    for change in changes:
+        fields = {field: change[field] for field in ("solved", "revised") if field in change}
+        entries += _progress_entries(username, change["problem_id"], fields, change.get("difficulty"))
+    _enqueue(entries)
+
+def queue_note(username, problem_id, note_text):
+    """Queues a note save."""
+    _enqueue([("note", username, problem_id, "note_text", {"value": note_text})])
+
+def flush_outbox(batch_size=FLUSH_BATCH_SIZE):
+    """Sends one batch of queued writes to MongoDB with per-field last-writer-wins; returns entries flushed."""
+    from progress import apply_progress_changes, get_progress_for_problems
+
+    rows = _conn().execute(
+        "SELECT seq, kind, username, problem_id, field, value, ts FROM outbox ORDER BY seq LIMIT ?", (batch_size,)
+    ).fetchall()
+    if not rows:
+        return 0
+
+    # Within a batch only the latest write to each field matters.
+    latest = {}
+    for seq, kind, username, problem_id, field, value, ts in rows:
+        latest[(kind, username, problem_id, field)] = (json.loads(value), ts)
+
+    progress_by_user, notes_by_user = {}, {}
+    for (kind, username, problem_id, field), entry in latest.items():
+        target = notes_by_user if kind == "note" else progress_by_user
+        target.setdefault(username, {}).setdefault(problem_id, {})[field] = entry
+
+    for username, problems in progress_by_user.items():
+        remote = get_progress_for_problems(
+            username, problems, {"problem_id": 1, "solved": 1, "solved_at": 1, "revised": 1, "_ts": 1, "_id": 0}
+        )
+        changes = []
+        for problem_id, fields in problems.items():
+            current = remote.get(problem_id, {})
+            change = {"problem_id": problem_id, "difficulty": None, "ts": {}}
+            for field, (value, ts) in fields.items():
+                # A newer write from another instance already reached MongoDB: it wins.
+                if current.get("_ts", {}).get(field, 0) >= ts:
+                    _state["primed"].pop(username, None)  # Re-prime so the local copy picks up the winner.
+                    continue
+                change[field] = value["value"]
+                change["ts"][field] = ts
+                if field == "solved":
+                    change["solved_at"] = _from_iso(value.get("solved_at"))
+                    change["difficulty"] = value.get("difficulty")
+            if change["ts"]:
+                changes.append(change)
+        apply_progress_changes(username, changes, remote)
+
+    for username, problems in notes_by_user.items():
+        object_ids = [ObjectId(problem_id) for problem_id in problems]
+        remote = {
+            str(note["problem_id"]): note.get("_ts", 0)
+            for note in database.notes_collection.find({"username": username, "problem_id": {"$in": object_ids}}, {"problem_id": 1, "_ts": 1})
+        }
+        operations = [
+            pymongo.UpdateOne(
+                {"username": username, "problem_id": ObjectId(problem_id)},
+                {"$set": {"note_text": value["value"], "_ts": ts}},
+                upsert=True,
+            )
+            for problem_id, fields in problems.items()
+            for value, ts in [fields["note_text"]]
+            if remote.get(problem_id, 0) < ts
+        ]
+        if len(operations) < len(problems):
+            _state["primed"].pop(username, None)
+        if operations:
+            database.notes_collection.bulk_write(operations, ordered=False)
+
+    with _lock:
+        _conn().executemany("DELETE FROM outbox WHERE seq = ?", [(row[0],) for row in rows])
+    return len(rows)
+
+def pending_writes():
+    """Returns how many writes are waiting to be flushed."""
+    return _conn().execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+def _flush_loop():
+    """Flushes the outbox whenever woken, or every FLUSH_INTERVAL seconds, while MongoDB is reachable."""
+    while True:
+        _wake.wait(FLUSH_INTERVAL)
+        _wake.clear()
+        try:
+            while check_db_connection() and flush_outbox():
+                pass
+        except pymongo.errors.PyMongoError:
+            # Entries stay queued and are retried on the next pass.
+            pass
+
+def start_flusher():
+    """Starts the background flusher thread once per process."""
+    with _lock:
+        if _state["flusher"] is None:
+            _state["flusher"] = threading.Thread(target=_flush_loop, name="local-cache-flusher", daemon=True)
+            _state["flusher"].start()
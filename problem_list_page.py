@@ -2,8 +2,17 @@
 
 import streamlit as st
 import datetime
-import random
-from database import problems_collection, users_collection, notes_collection
+import time
+from pymongo.errors import PyMongoError
+import local_cache
+from database import check_db_connection
+from progress import get_completed_problem_ids
+from facet_catalog import get_facet_catalog
+from recommender import load_recommendations
+from problem_queries import (
+    build_problem_query, count_problems, fetch_problem_page, fetch_ranked_page, sample_problems, search_problems, load_page_view,
+    save_solved, save_revised, save_progress_changes, load_note, save_note,
+)
 
 def get_difficulty_color(difficulty):
     """Returns a color based on difficulty, case-insensitively."""
@@ -17,25 +26,136 @@ def render_tag(text, color, text_color="white"):
     """Renders a styled HTML tag."""
     return f"<span style='background-color: {color}; color: {text_color}; font-size: 14px; font-weight: bold; border-radius: 5px; padding: 4px 10px; margin-right: 5px;'>{text}</span>"
 
+def render_problem_list(rows):
+    """Renders a page of problems as rows of tags and progress buttons."""
+    for row in rows:
+        problem = row["problem"]
+        problem_id_str = row["id"]
+        with st.container():
+            col1, col2, col3, col4 = st.columns([0.5, 0.17, 0.17, 0.16])
+            
+            # Column 1: Problem Details and Tags
+            with col1:
+                st.markdown(f"<div style='font-size: 22px; font-weight: bold;'>{problem.get('name', 'Unnamed Problem')}</div>", unsafe_allow_html=True)
+                
+                tags_html = ""
+                # Company Tags
+                for company in problem.get("company_tag", []):
+                    tags_html += render_tag(company, "#007bff")
+                
+                # CORRECTED: Difficulty Tag with proper color and title case display
+                difficulty = problem.get("difficulty")
+                if difficulty:
+                    tags_html += render_tag(difficulty.title(), get_difficulty_color(difficulty))
+                
+                # Topic Tags
+                for topic in problem.get("topics", []):
+                    tags_html += render_tag(topic, "#6c757d")
+                
+                st.markdown(tags_html, unsafe_allow_html=True)
+                st.write(f"**Link:** [{problem.get('link', '#')}]({problem.get('link', '#')})")
+                if problem.get("solve_count"):
+                    st.caption(f"Solved by {problem['solve_count']} user(s)")
+
+            # Column 2: Solve Button and Date
+            with col2:
+                solved = row["solved"]
+
+                if st.button("✅ Solved" if solved else "Solve", key=f"solve_{problem_id_str}", use_container_width=True):
+                    save_solved(st.session_state.username, problem_id_str, not solved, problem.get("difficulty"))
+                    st.rerun()
+
+                if solved:
+                    solved_at_date = row["solved_at"]
+                    if isinstance(solved_at_date, datetime.datetime):
+                        date_str = solved_at_date.strftime("%Y-%m-%d")
+                        st.markdown(f"<p style='font-size:12px; text-align:center; color:#28a745; margin-top: 5px;'>{date_str}</p>", unsafe_allow_html=True)
+
+            # Column 3: Revise Button
+            with col3:
+                revised = row["revised"]
+                if st.button("🔄 Revised" if revised else "Revise", key=f"revise_{problem_id_str}", use_container_width=True):
+                    save_revised(st.session_state.username, problem_id_str, not revised)
+                    st.rerun()
+
+            # Column 4: Notes Button
+            with col4:
+                if st.button("📝 Notes" if row["has_note"] else "🗒️ Notes", key=f"note_{problem_id_str}", use_container_width=True):
+                    st.session_state.editing_note_for = problem
+                    st.rerun()
+
+            st.divider()
+
+def render_problem_grid(rows):
+    """Renders a page of problems as one editable grid whose edits are saved in a single batch."""
+    import pandas as pd  # Only grid mode needs pandas; keep it off the default page's import path.
+    grid = pd.DataFrame({
+        "Name": [row["problem"].get("name", "Unnamed Problem") for row in rows],
+        "Link": [row["problem"].get("link", "#") for row in rows],
+        "Difficulty": [str(row["problem"].get("difficulty", "")).title() for row in rows],
+        "Companies": [row["problem"].get("company_tag", []) for row in rows],
+        "Topics": [row["problem"].get("topics", []) for row in rows],
+        "Solved By": [row["problem"].get("solve_count", 0) for row in rows],
+        "Solved": [bool(row["solved"]) for row in rows],
+        "Revised": [bool(row["revised"]) for row in rows],
+        "Note": [bool(row["has_note"]) for row in rows],
+    })
+    grid_key = f"problem_grid_{st.session_state.get('problem_grid_version', 0)}_{','.join(row['id'] for row in rows)}"
+    edited = st.data_editor(
+        grid,
+        key=grid_key,
+        hide_index=True,
+        use_container_width=True,
+        disabled=["Name", "Link", "Difficulty", "Companies", "Topics", "Solved By", "Note"],
+        column_config={
+            "Link": st.column_config.LinkColumn("Link", display_text="Open"),
+            "Companies": st.column_config.ListColumn("Companies"),
+            "Topics": st.column_config.ListColumn("Topics"),
+            "Solved": st.column_config.CheckboxColumn("✅ Solved"),
+            "Revised": st.column_config.CheckboxColumn("🔄 Revised"),
+            "Note": st.column_config.CheckboxColumn("📝 Note"),
+        },
+    )
+
+    changes = []
+    for index, row in enumerate(rows):
+        change = {}
+        if bool(edited.at[index, "Solved"]) != grid.at[index, "Solved"]:
+            change["solved"] = bool(edited.at[index, "Solved"])
+        if bool(edited.at[index, "Revised"]) != grid.at[index, "Revised"]:
+            change["revised"] = bool(edited.at[index, "Revised"])
+        if change:
+            change.update(problem_id=row["id"], difficulty=row["problem"].get("difficulty"))
+            changes.append(change)
+
+    if st.button(f"💾 Save {len(changes)} change(s)", type="primary", disabled=not changes):
+        save_progress_changes(st.session_state.username, changes)
+        st.session_state.problem_grid_version = st.session_state.get("problem_grid_version", 0) + 1
+        st.toast("Progress saved!")
+        st.rerun()
+
 def problem_list_page():
     st.title("📋 Problem List Dashboard")
 
+    # --- Local Cache ---
+    # Pulls catalog changes and the user's progress into SQLite while MongoDB is reachable.
+    if local_cache.enabled():
+        online = local_cache.refresh_catalog()
+        local_cache.prime_user(st.session_state.username)
+        if not online:
+            st.warning("Working offline: changes are saved locally and will sync when the database is reachable.")
+
     # --- Note Editor View ---
     if st.session_state.get("editing_note_for"):
         problem = st.session_state.editing_note_for
         st.subheader(f"📝 Note Editor for: {problem.get('name', 'Unknown Problem')}")
         
-        user_note = notes_collection.find_one({"problem_id": problem["_id"], "username": st.session_state.username})
-        current_note = user_note.get("note_text", "") if user_note else ""
+        current_note = load_note(st.session_state.username, problem["_id"])
         new_note = st.text_area("Your personal notes:", value=current_note, height=300, label_visibility="collapsed")
 
         col1, col2 = st.columns([0.2, 0.8])
         if col1.button("💾 Save Note", use_container_width=True, type="primary"):
-            notes_collection.update_one(
-                {"problem_id": problem["_id"], "username": st.session_state.username},
-                {"$set": {"note_text": new_note}},
-                upsert=True
-            )
+            save_note(st.session_state.username, problem["_id"], new_note)
             st.toast("Note saved!")
             st.session_state.editing_note_for = None
             st.rerun()
@@ -45,123 +165,135 @@ def problem_list_page():
         return
 
     # --- Main Problem List View ---
+    started = time.perf_counter()
+    search_text = st.text_input("🔎 **Search**", placeholder="Search by problem name or topic (typos are fine)", key="problem_search")
+
     st.subheader("Filters")
 
     # --- Filter Setup ---
-    # CORRECTED: Simplified and correct way to get unique company tags.
-    company_list = ["All"] + sorted(problems_collection.distinct("company_tag"))
-    difficulty_list = ["All"] + sorted(problems_collection.distinct("difficulty"))
-    topic_list = sorted(problems_collection.distinct("topics"))
+    # Values and counts come from the cached facet catalog instead of distinct scans.
+    facets = get_facet_catalog()
+    company_counts = facets["company_tag"]
+    difficulty_counts = facets["difficulty"]
+    topic_counts = facets["topics"]
 
     filter_cols = st.columns(4)
-    selected_company = filter_cols[0].selectbox("**Company**", options=company_list)
-    selected_difficulty = filter_cols[1].selectbox("**Difficulty**", options=difficulty_list)
-    selected_topics = filter_cols[2].multiselect("**Topics (Intersection)**", options=topic_list)
+    selected_company = filter_cols[0].selectbox(
+        "**Company**", options=["All"] + list(company_counts),
+        format_func=lambda x: x if x == "All" else f"{x} ({company_counts[x]})"
+    )
+    selected_difficulty = filter_cols[1].selectbox(
+        "**Difficulty**", options=["All"] + list(difficulty_counts),
+        format_func=lambda x: x if x == "All" else f"{x} ({difficulty_counts[x]})"
+    )
+    selected_topics = filter_cols[2].multiselect(
+        "**Topics (Intersection)**", options=list(topic_counts),
+        format_func=lambda x: f"{x} ({topic_counts[x]})"
+    )
 
     # --- Database Query ---
-    query = {}
-    if selected_company != "All": query["company_tag"] = selected_company
-    if selected_difficulty != "All": query["difficulty"] = selected_difficulty
-    if selected_topics: query["topics"] = {"$all": selected_topics}
-    
-    problem_list = list(problems_collection.find(query).sort("name", 1))
+    query = build_problem_query(selected_company, selected_difficulty, selected_topics)
+    ranked_ids = None
+    if search_text.strip():
+        search_started = time.perf_counter()
+        try:
+            ranked_ids = search_problems(search_text, query)
+        except PyMongoError:
+            st.warning("Search needs the database and is unavailable offline.")
+            ranked_ids = []
+        # Restricting the filter to the hits keeps random picks and practice sets inside the search.
+        query = {**query, "_id": {"$in": ranked_ids}}
+        total_problems = len(ranked_ids)
+        st.caption(f"{total_problems} results in {(time.perf_counter() - search_started) * 1000:.0f} ms")
+    else:
+        total_problems = count_problems(query)
 
     with filter_cols[3]:
         st.write("")
         st.write("")
-        if st.button("🎲 Random", use_container_width=True, disabled=not problem_list):
-            if problem_list:
-                pick = random.choice(problem_list)
-                st.info(f"**Random Pick:** [{pick.get('name', 'Unnamed Problem')}]({pick.get('link', '#')})")
+        random_clicked = st.button("🎲 Random", use_container_width=True, disabled=not total_problems)
+
+    # --- Random Picks ---
+    # Picks are sampled in the database, so they never need the filtered list in memory.
+    pick_cols = st.columns([0.3, 0.2, 0.2, 0.3])
+    unsolved_only = pick_cols[0].toggle("Only problems I haven't solved or revised", key="pick_unsolved_only")
+    practice_size = pick_cols[1].number_input("Practice set size", min_value=1, max_value=20, value=5, step=1)
+    with pick_cols[2]:
+        st.write("")
+        practice_clicked = st.button("🎯 Practice Set", use_container_width=True, disabled=not total_problems)
+
+    if random_clicked or practice_clicked:
+        try:
+            exclude_ids = get_completed_problem_ids(st.session_state.username) if unsolved_only else None
+            picks = sample_problems(query, 1 if random_clicked else practice_size, exclude_ids)
+        except PyMongoError:
+            st.warning("Random picks need the database and are unavailable offline.")
+            picks = None
+        if picks == []:
+            st.warning("No matching problems left to pick.")
+        elif picks and random_clicked:
+            pick = picks[0]
+            st.info(f"**Random Pick:** [{pick.get('name', 'Unnamed Problem')}]({pick.get('link', '#')})")
+        elif picks:
+            practice_lines = [f"1. [{pick.get('name', 'Unnamed Problem')}]({pick.get('link', '#')})" for pick in picks]
+            st.info("**Practice Set:**\n" + "\n".join(practice_lines))
+
+    # --- Recommendations ---
+    # Scoring may re-encode the catalog and reads all of the user's progress, so it only runs
+    # when asked for; the last suggestions are kept for the session until refreshed.
+    with st.expander("✨ Recommended for you"):
+        company = None if selected_company == "All" else selected_company
+        if st.button("Suggest problems", key="load_recommendations"):
+            if not check_db_connection():
+                st.warning("Recommendations need the database and are unavailable offline.")
+            else:
+                try:
+                    st.session_state.recommendations = {
+                        "company": company, "rows": load_recommendations(st.session_state.username, company=company),
+                    }
+                except PyMongoError:
+                    st.warning("Recommendations need the database and are unavailable offline.")
+        shown = st.session_state.get("recommendations")
+        recommendations = shown["rows"] if shown and shown["company"] == company else []
+        for recommendation in recommendations:
+            problem = recommendation["problem"]
+            difficulty = problem.get("difficulty")
+            tags_html = render_tag(difficulty.title(), get_difficulty_color(difficulty)) if difficulty else ""
+            reasons = f" · builds on {', '.join(recommendation['reasons'])}" if recommendation["reasons"] else ""
+            st.markdown(
+                f"[{problem.get('name', 'Unnamed Problem')}]({problem.get('link', '#')}) {tags_html}{reasons}",
+                unsafe_allow_html=True,
+            )
 
     st.divider()
 
     # --- Pagination ---
-    problems_per_page = 25
-    total_problems = len(problem_list)
+    view_cols = st.columns([1, 1, 1, 2])
+    view_mode = view_cols[0].radio("View", options=["List", "Grid"], horizontal=True, key="problem_list_view_mode")
+    problems_per_page = view_cols[1].selectbox("Problems per page", options=[25, 50, 100, 250], key="problem_list_page_size")
     total_pages = max((total_problems - 1) // problems_per_page + 1, 1)
 
     if "problem_list_page_number" not in st.session_state or st.session_state.problem_list_page_number > total_pages:
         st.session_state.problem_list_page_number = 1
-    
-    col_page = st.columns([1, 4])[0]
-    page_num = col_page.number_input(
+
+    page_num = view_cols[2].number_input(
         "Page", min_value=1, max_value=total_pages, key="problem_list_page_number", step=1, format="%d"
     )
 
-    start_idx = (page_num - 1) * problems_per_page
-    end_idx = start_idx + problems_per_page
-    problems_to_display = problem_list[start_idx:end_idx]
+    if ranked_ids is not None:
+        problems_to_display = fetch_ranked_page(ranked_ids, page_num, problems_per_page)
+    else:
+        problems_to_display = fetch_problem_page(query, page_num, problems_per_page)
 
     # --- Display Problems ---
-    user_data = users_collection.find_one({"username": st.session_state.username})
-    user_progress = user_data.get("progress", {}) if user_data else {}
-
-    for problem in problems_to_display:
-        problem_id_str = str(problem["_id"])
-        with st.container():
-            col1, col2, col3, col4 = st.columns([0.5, 0.17, 0.17, 0.16])
-            
-            # Column 1: Problem Details and Tags
-            with col1:
-                st.markdown(f"<div style='font-size: 22px; font-weight: bold;'>{problem.get('name', 'Unnamed Problem')}</div>", unsafe_allow_html=True)
-                
-                tags_html = ""
-                # Company Tags
-                for company in problem.get("company_tag", []):
-                    tags_html += render_tag(company, "#007bff")
-                
-                # CORRECTED: Difficulty Tag with proper color and title case display
-                difficulty = problem.get("difficulty")
-                if difficulty:
-                    tags_html += render_tag(difficulty.title(), get_difficulty_color(difficulty))
-                
-                # Topic Tags
-                for topic in problem.get("topics", []):
-                    tags_html += render_tag(topic, "#6c757d")
-                
-                st.markdown(tags_html, unsafe_allow_html=True)
-                st.write(f"**Link:** [{problem.get('link', '#')}]({problem.get('link', '#')})")
-
-            # Column 2: Solve Button and Date
-            with col2:
-                problem_progress = user_progress.get(problem_id_str, {})
-                solved = problem_progress.get("solved", False)
-
-                if st.button("✅ Solved" if solved else "Solve", key=f"solve_{problem_id_str}", use_container_width=True):
-                    users_collection.update_one(
-                        {"username": st.session_state.username},
-                        {"$set": {
-                            f"progress.{problem_id_str}.solved": not solved,
-                            f"progress.{problem_id_str}.solved_at": datetime.datetime.now(datetime.timezone.utc) if not solved else None
-                        }},
-                        upsert=True
-                    )
-                    st.rerun()
-
-                if solved:
-                    solved_at_date = problem_progress.get("solved_at")
-                    if isinstance(solved_at_date, datetime.datetime):
-                        date_str = solved_at_date.strftime("%Y-%m-%d")
-                        st.markdown(f"<p style='font-size:12px; text-align:center; color:#28a745; margin-top: 5px;'>{date_str}</p>", unsafe_allow_html=True)
-
-            # Column 3: Revise Button
-            with col3:
-                revised = user_progress.get(problem_id_str, {}).get("revised", False)
-                if st.button("🔄 Revised" if revised else "Revise", key=f"revise_{problem_id_str}", use_container_width=True):
-                    users_collection.update_one(
-                        {"username": st.session_state.username},
-                        {"$set": {f"progress.{problem_id_str}.revised": not revised}},
-                        upsert=True
-                    )
-                    st.rerun()
-
-            # Column 4: Notes Button
-            with col4:
-                note = notes_collection.find_one({"problem_id": problem["_id"], "username": st.session_state.username})
-                note_exists = note and note.get("note_text")
-                if st.button("📝 Notes" if note_exists else "🗒️ Notes", key=f"note_{problem_id_str}", use_container_width=True):
-                    st.session_state.editing_note_for = problem
-                    st.rerun()
+    rows = load_page_view(problems_to_display, st.session_state.username)
+    if view_mode == "Grid":
+        render_problem_grid(rows)
+    else:
+        render_problem_list(rows)
 
-            st.divider()
\ No newline at end of file
+    # --- Render Timing ---
+    # Server-side time for this rerun, kept per view mode so the two can be compared.
+    render_times = st.session_state.setdefault("problem_list_render_ms", {})
+    render_times[view_mode] = (time.perf_counter() - started) * 1000
+    st.caption("Rerun time · " + " · ".join(f"{mode}: {ms:.0f} ms" for mode, ms in render_times.items()) + f" ({len(rows)} rows)")
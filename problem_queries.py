@@ -0,0 +1,149 @@
+# problem_queries.py
+
+import time
+import local_cache
+from database import problems_collection, notes_collection
+from progress import get_progress_for_problems, set_solved, set_revised, apply_progress_changes
+from search_index import search_problem_ids
+
+# Only the fields the problem list renders are pulled from the database.
+PROBLEM_LIST_FIELDS = {"name": 1, "link": 1, "difficulty": 1, "company_tag": 1, "topics": 1, "solve_count": 1}
+
+def build_problem_query(company="All", difficulty="All", topics=None):
+    """Builds the MongoDB filter for the selected problem list filters."""
+    query = {}
+    if company != "All": query["company_tag"] = company
+    if difficulty != "All": query["difficulty"] = difficulty
+    if topics: query["topics"] = {"$all": topics}
+    return query
+
+def count_problems(query):
+    """Counts problems matching a filter, using collection metadata when unfiltered."""
+    if local_cache.enabled():
+        return local_cache.count_problems(query)
+    if not query:
+        return problems_collection.estimated_document_count()
+    return problems_collection.count_documents(query)
+
+def fetch_problem_page(query, page_num, per_page):
+    """Fetches one page of problems sorted by name, with only the listed fields."""
+    if local_cache.enabled():
+        return local_cache.fetch_problem_page(query, page_num, per_page)
+    cursor = (
+        problems_collection.find(query, PROBLEM_LIST_FIELDS)
+        .sort("name", 1)
+        .skip((page_num - 1) * per_page)
+        .limit(per_page)
+    )
+    return list(cursor)
+
+def search_problems(text, query, limit=500):
+    """Returns ids of problems matching text and the filters, ranked best first.
+
+    Fuzzy name matches from the in-process n-gram index come first; the Mongo text
+    index over name and topics tops up the list, e.g. for topic words.
+    """
+    ranked = search_problem_ids(text, limit)
+    if len(ranked) < limit:
+        seen = set(ranked)
+        text_hits = (
+            problems_collection.find({**query, "$text": {"$search": text}}, {"score": {"$meta": "textScore"}})
+            .sort([("score", {"$meta": "textScore"})])
+            .limit(limit - len(ranked))
+        )
+        ranked += [hit["_id"] for hit in text_hits if hit["_id"] not in seen]
+    if not ranked:
+        return []
+    matched = {doc["_id"] for doc in problems_collection.find({**query, "_id": {"$in": ranked}}, {"_id": 1})}
+    return [problem_id for problem_id in ranked if problem_id in matched]
+
+def fetch_ranked_page(ranked_ids, page_num, per_page):
+    """Fetches one page of problems in the order of a ranked id list."""
+    page_ids = ranked_ids[(page_num - 1) * per_page:page_num * per_page]
+    if local_cache.enabled():
+        problems = local_cache.fetch_problems_by_id(page_ids)
+        return [problems[problem_id] for problem_id in page_ids if problem_id in problems]
+    problems = {problem["_id"]: problem for problem in problems_collection.find({"_id": {"$in": page_ids}}, PROBLEM_LIST_FIELDS)}
+    return [problems[problem_id] for problem_id in page_ids if problem_id in problems]
+
+def sample_problems(query, size=1, exclude_ids=None):
+    """Samples random problems matching a filter in the database, skipping excluded ids."""
+    match = dict(query)
+    if exclude_ids:
+        # Combined with $and so an _id condition already in the query (e.g. search hits) is kept.
+        match = {"$and": [match, {"_id": {"$nin": list(exclude_ids)}}]}
+    pipeline = [{"$match": match}, {"$sample": {"size": size}}, {"$project": PROBLEM_LIST_FIELDS}]
+    return list(problems_collection.aggregate(pipeline))
+
+def load_page_view(problems, username):
+    """Builds the render-ready rows for a page of problems with one progress and one notes query."""
+    problem_ids = [problem["_id"] for problem in problems]
+    id_strs = [str(problem_id) for problem_id in problem_ids]
+
+    if local_cache.enabled():
+        user_progress = local_cache.get_progress(username, id_strs)
+        noted_strs = local_cache.get_noted_ids(username, id_strs)
+        noted_ids = {problem_id for problem_id, id_str in zip(problem_ids, id_strs) if id_str in noted_strs}
+    else:
+        user_progress = get_progress_for_problems(username, id_strs)
+        noted_ids = {
+            note["problem_id"]
+            for note in notes_collection.find(
+                {"username": username, "problem_id": {"$in": problem_ids}, "note_text": {"$nin": ["", None]}},
+                {"problem_id": 1, "_id": 0},
+            )
+        } if problem_ids else set()
+
+    rows = []
+    for problem, id_str in zip(problems, id_strs):
+        problem_progress = user_progress.get(id_str, {})
+        rows.append({
+            "problem": problem,
+            "id": id_str,
+            "solved": problem_progress.get("solved", False),
+            "solved_at": problem_progress.get("solved_at"),
+            "revised": problem_progress.get("revised", False),
+            "has_note": problem["_id"] in noted_ids,
+        })
+    return rows
+
+# --- Writes ---
+# With the local cache enabled, writes land in SQLite at once and reach MongoDB via its outbox.
+def save_solved(username, problem_id, solved, difficulty=None):
+    """Marks a problem solved or unsolved."""
+    if local_cache.enabled():
+        local_cache.queue_progress(username, problem_id, {"solved": solved}, difficulty)
+    else:
+        set_solved(username, problem_id, solved, difficulty)
+
+def save_revised(username, problem_id, revised):
+    """Marks a problem revised or unrevised."""
+    if local_cache.enabled():
+        local_cache.queue_progress(username, problem_id, {"revised": revised})
+    else:
+        set_revised(username, problem_id, revised)
+
+def save_progress_changes(username, changes):
+    """Saves a batch of grid edits."""
+    if local_cache.enabled():
+        local_cache.queue_progress_changes(username, changes)
+    else:
+        apply_progress_changes(username, changes)
+
+def load_note(username, problem_id):
+    """Returns the user's note text for a problem."""
+    if local_cache.enabled():
+        return local_cache.get_note(username, str(problem_id))
+    user_note = notes_collection.find_one({"problem_id": problem_id, "username": username})
+    return user_note.get("note_text", "") if user_note else ""
+
+def save_note(username, problem_id, note_text):
+    """Saves the user's note for a problem."""
+    if local_cache.enabled():
+        local_cache.queue_note(username, str(problem_id), note_text)
+        return
+    notes_collection.update_one(
+        {"problem_id": problem_id, "username": username},
+        {"$set": {"note_text": note_text, "_ts": time.time()}},
+        upsert=True
+    )
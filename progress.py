@@ -0,0 +1,181 @@
+# progress.py
+
+import argparse
+import datetime
+import time
+from pymongo import ReturnDocument, UpdateOne
+from bson import ObjectId
+from database import problems_collection, users_collection, progress_collection
+from activity import record_solve, record_solves, rebuild_activity
+from leaderboard import record_solve_stats
+
+PROGRESS_FIELDS = {"problem_id": 1, "solved": 1, "solved_at": 1, "revised": 1, "_id": 0}
+
+def get_progress_for_problems(username, problem_ids, fields=PROGRESS_FIELDS):
+    """Returns {problem_id: progress} for the given problem id strings."""
+    if not problem_ids:
+        return {}
+    cursor = progress_collection.find({"username": username, "problem_id": {"$in": list(problem_ids)}}, fields)
+    return {doc["problem_id"]: doc for doc in cursor}
+
+def get_completed_problem_ids(username):
+    """Returns the ObjectIds of every problem the user has solved or revised."""
+    problem_ids = progress_collection.distinct(
+        "problem_id", {"username": username, "$or": [{"solved": True}, {"revised": True}]}
+    )
+    return [ObjectId(problem_id) for problem_id in problem_ids if ObjectId.is_valid(problem_id)]
+
+def get_progress_counters(username, user_data=None):
+    """Returns the maintained solved/revised counters for a user."""
+    if user_data is None:
+        user_data = users_collection.find_one({"username": username}, {"stats": 1}) or {}
+    stats = user_data.get("stats", {})
+    return {"solved": max(stats.get("solved", 0), 0), "revised": max(stats.get("revised", 0), 0)}
+
+def _toggle(username, problem_id, field, value, extra=None):
+    """Sets a progress flag and adjusts the user's counter only if the flag actually changed."""
+    before = progress_collection.find_one_and_update(
+        {"username": username, "problem_id": problem_id},
+        {"$set": {field: value, f"_ts.{field}": time.time(), **(extra or {})}},
+        projection={field: 1, "solved_at": 1, "_id": 0},
+        upsert=True,
+        return_document=ReturnDocument.BEFORE,
+    ) or {}
+    if bool(before.get(field)) != value:
+        users_collection.update_one({"username": username}, {"$inc": {f"stats.{field}": 1 if value else -1}})
+    return before
+
+def set_solved(username, problem_id, solved, difficulty=None):
+    """Marks a problem solved or unsolved, keeping the daily activity rollups in step."""
+    solved_at = datetime.datetime.now(datetime.timezone.utc) if solved else None
+    before = _toggle(username, problem_id, "solved", solved, {"solved_at": solved_at})
+    if bool(before.get("solved")) != solved:
+        if difficulty is None:
+            problem = problems_collection.find_one({"_id": ObjectId(problem_id)}, {"difficulty": 1}) or {}
+            difficulty = problem.get("difficulty")
+        # Unsolving takes the solve back off the day it was originally counted on.
+        record_solve(username, solved_at if solved else before.get("solved_at"), difficulty, 1 if solved else -1)
+        record_solve_stats(username, [(problem_id, difficulty, 1 if solved else -1)])
+    return before
+
+def set_revised(username, problem_id, revised):
+    """Marks a problem revised or unrevised and returns the previous progress state."""
+    return _toggle(username, problem_id, "revised", revised)
+
+def _lookup_difficulties(problem_ids):
+    """Returns {problem_id: difficulty} for problem id strings in one query."""
+    object_ids = [ObjectId(problem_id) for problem_id in problem_ids if ObjectId.is_valid(problem_id)]
+    if not object_ids:
+        return {}
+    return {
+        str(problem["_id"]): problem.get("difficulty")
+        for problem in problems_collection.find({"_id": {"$in": object_ids}}, {"difficulty": 1})
+    }
+
+def apply_progress_changes(username, changes, current=None):
+    """Commits a batch of progress edits with one bulk_write, then updates counters and rollups.
+
+    Each change holds problem_id, difficulty and the new "solved" and/or "revised" values.
+    Counter deltas are taken against the progress stored now, read for all changed problems
+    in one query unless the caller already holds it as `current`, so edits another tab saved
+    since the grid rendered are not counted twice. Queued offline edits also carry their own
+    "solved_at" and per-field write times in "ts", which are stored under _ts for
+    last-writer-wins conflict resolution.
+    """
+    if not changes:
+        return 0
+    if current is None:
+        current = get_progress_for_problems(username, [change["problem_id"] for change in changes])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    now_ts = time.time()
+    operations = []
+    deltas = {"solved": 0, "revised": 0}
+    rollups = []
+    solve_stats = []
+    missing = _lookup_difficulties([change["problem_id"] for change in changes if "solved" in change and change.get("difficulty") is None])
+    for change in changes:
+        difficulty = change.get("difficulty") or missing.get(change["problem_id"])
+        update = {}
+        previous = current.get(change["problem_id"], {})
+        solved_at = change.get("solved_at") or now
+        if "solved" in change and change["solved"] != bool(previous.get("solved")):
+            update["solved"] = change["solved"]
+            update["solved_at"] = solved_at if change["solved"] else None
+            deltas["solved"] += 1 if change["solved"] else -1
+            rollups.append((solved_at if change["solved"] else previous.get("solved_at"), difficulty, 1 if change["solved"] else -1))
+            solve_stats.append((change["problem_id"], difficulty, 1 if change["solved"] else -1))
+        if "revised" in change and change["revised"] != bool(previous.get("revised")):
+            update["revised"] = change["revised"]
+            deltas["revised"] += 1 if change["revised"] else -1
+        for field in ("solved", "revised"):
+            if field in update:
+                update[f"_ts.{field}"] = change.get("ts", {}).get(field, now_ts)
+        if update:
+            operations.append(UpdateOne({"username": username, "problem_id": change["problem_id"]}, {"$set": update}, upsert=True))
+
+    if operations:
+        progress_collection.bulk_write(operations, ordered=False)
+    increments = {f"stats.{field}": delta for field, delta in deltas.items() if delta}
+    if increments:
+        users_collection.update_one({"username": username}, {"$inc": increments})
+    record_solves(username, rollups)
+    record_solve_stats(username, solve_stats)
+    return len(operations)
+
+def recount_progress_counters(username):
+    """Rebuilds a user's solved/revised counters from the progress collection."""
+    solved = progress_collection.count_documents({"username": username, "solved": True})
+    revised = progress_collection.count_documents({"username": username, "revised": True})
+    users_collection.update_one({"username": username}, {"$set": {"stats.solved": solved, "stats.revised": revised}})
+    return {"solved": solved, "revised": revised}
+
+# --- Migration ---
+def migrate_user_progress(username):
+    """Moves a user's embedded progress map into the progress collection, if one is left."""
+    user_data = users_collection.find_one({"username": username, "progress": {"$exists": True}}, {"progress": 1})
+    if not user_data:
+        return 0
+
+    operations = []
+    solved_ids = []
+    for problem_id, data in (user_data.get("progress") or {}).items():
+        doc = {
+            "solved": bool(data.get("solved")),
+            "solved_at": data.get("solved_at"),
+            "revised": bool(data.get("revised")),
+        }
+        # $setOnInsert keeps any newer toggle that already reached the progress collection.
+        operations.append(UpdateOne({"username": username, "problem_id": problem_id}, {"$setOnInsert": doc}, upsert=True))
+        solved_ids.append(problem_id if doc["solved"] else None)
+    if operations:
+        result = progress_collection.bulk_write(operations, ordered=False)
+        # Only entries actually inserted here are new solves for the leaderboard counters.
+        inserted = [solved_ids[index] for index in result.upserted_ids if solved_ids[index]]
+        difficulties = _lookup_difficulties(inserted)
+        record_solve_stats(username, [(problem_id, difficulties.get(problem_id), 1) for problem_id in inserted])
+
+    recount_progress_counters(username)
+    rebuild_activity(username)
+    users_collection.update_one({"_id": user_data["_id"]}, {"$unset": {"progress": ""}})
+    return len(operations)
+
+def main():
+    """Command-line entry point for migrating every user's embedded progress."""
+    parser = argparse.ArgumentParser(description="Migrate embedded user progress into the progress collection.")
+    parser.add_argument("--username", help="Only migrate this user.")
+    parser.add_argument("--rebuild-activity", action="store_true", help="Also rebuild daily activity rollups for already migrated users.")
+    args = parser.parse_args()
+
+    usernames = [args.username] if args.username else users_collection.distinct("username", {"progress": {"$exists": True}})
+    for username in usernames:
+        count = migrate_user_progress(username)
+        print(f"{username}: {count} progress entries migrated", flush=True)
+
+    if args.rebuild_activity:
+        usernames = [args.username] if args.username else progress_collection.distinct("username")
+        for username in usernames:
+            days = rebuild_activity(username)
+            print(f"{username}: {days} activity days rebuilt", flush=True)
+
+if __name__ == "__main__":
+    main()
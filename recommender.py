@@ -0,0 +1,203 @@
+# recommender.py
+
+import os
+import threading
+import time
+import numpy as np
+from database import problems_collection, progress_collection
+from facet_catalog import refresh_from_catalog
+
+# --- Settings ---
+TOPIC_WEIGHT = float(os.environ.get("RECOMMEND_TOPIC_WEIGHT", "1.0"))
+COMPANY_WEIGHT = float(os.environ.get("RECOMMEND_COMPANY_WEIGHT", "0.5"))
+DIFFICULTY_WEIGHT = float(os.environ.get("RECOMMEND_DIFFICULTY_WEIGHT", "0.3"))
+POPULARITY_WEIGHT = float(os.environ.get("RECOMMEND_POPULARITY_WEIGHT", "0.2"))
+POPULARITY_TTL = float(os.environ.get("RECOMMEND_POPULARITY_TTL", "600"))
+COMPACT_RATIO = 0.25
+
+DIFFICULTY_CODES = {"easy": 0, "medium": 1, "hard": 2}
+
+# Process-wide catalog encoding. The problem x feature matrix is kept in coordinate
+# form (entry_rows, entry_cols) so a user is scored with one bincount, i.e. a sparse
+# matrix-vector product. Re-encoded problems append new entries and tombstone their
+# old ones in entry_alive until the next compaction, like the search index's postings.
+_model = {
+    "version": None, "watermark": None, "ids": [], "row_of": {}, "spans": [], "features": {}, "names": [],
+    "entry_rows": np.zeros(0, np.int32), "entry_cols": np.zeros(0, np.int32), "entry_alive": np.zeros(0, bool),
+    "difficulty": np.zeros(0, np.int8), "row_norm": np.zeros(0, np.float32), "dead": 0,
+    "popularity": np.zeros(0, np.float32), "popularity_at": float("-inf"),
+}
+_lock = threading.Lock()
+
+def _feature(name):
+    """Returns the column of a feature such as "topic:Array", adding it if new."""
+    features = _model["features"]
+    if name not in features:
+        features[name] = len(features)
+        _model["names"].append(name)
+    return features[name]
+
+def _encode(problems):
+    """Appends (or re-encodes) problems as matrix rows."""
+    new_rows, new_cols, difficulty_updates = [], [], []
+    # Tombstoning writes to a copy so concurrent scorers keep a consistent snapshot.
+    _model["entry_alive"] = _model["entry_alive"].copy()
+    for problem in problems:
+        row = _model["row_of"].get(problem["_id"])
+        if row is None:
+            row = len(_model["ids"])
+            _model["ids"].append(problem["_id"])
+            _model["row_of"][problem["_id"]] = row
+            _model["spans"].append(None)
+        else:
+            start, end = _model["spans"][row]
+            _model["entry_alive"][start:end] = False
+            _model["dead"] += end - start
+        cols = [_feature(f"topic:{topic}") for topic in set(problem.get("topics") or [])]
+        cols += [_feature(f"company:{company}") for company in set(problem.get("company_tag") or [])]
+        start = len(_model["entry_rows"]) + len(new_rows)
+        _model["spans"][row] = (start, start + len(cols))
+        new_rows += [row] * len(cols)
+        new_cols += cols
+        difficulty_updates.append((row, DIFFICULTY_CODES.get(str(problem.get("difficulty", "")).lower(), -1)))
+
+    _model["entry_rows"] = np.concatenate([_model["entry_rows"], np.array(new_rows, np.int32)])
+    _model["entry_cols"] = np.concatenate([_model["entry_cols"], np.array(new_cols, np.int32)])
+    _model["entry_alive"] = np.concatenate([_model["entry_alive"], np.ones(len(new_rows), bool)])
+    difficulty = np.full(len(_model["ids"]), -1, np.int8)
+    difficulty[:len(_model["difficulty"])] = _model["difficulty"]
+    for row, code in difficulty_updates:
+        difficulty[row] = code
+    _model["difficulty"] = difficulty
+
+def _compact():
+    """Drops tombstoned entries and recomputes each row's span."""
+    alive = _model["entry_alive"]
+    rows, cols = _model["entry_rows"][alive], _model["entry_cols"][alive]
+    order = np.argsort(rows, kind="stable")
+    rows, cols = rows[order], cols[order]
+    starts = np.searchsorted(rows, np.arange(len(_model["ids"])), side="left")
+    ends = np.searchsorted(rows, np.arange(len(_model["ids"])), side="right")
+    _model.update(entry_rows=rows, entry_cols=cols, entry_alive=np.ones(len(rows), bool), dead=0)
+    _model["spans"] = list(zip(starts.tolist(), ends.tolist()))
+
+def _update_row_norm():
+    """Rows with many tags would otherwise outscore focused ones; scores are scaled by 1/sqrt(tags)."""
+    alive = _model["entry_alive"]
+    row_nnz = np.bincount(_model["entry_rows"][alive], minlength=len(_model["ids"]))
+    _model["row_norm"] = (1 / np.sqrt(np.maximum(row_nnz, 1))).astype(np.float32)
+
+def _reset():
+    """Empties the encoding before the full catalog is re-encoded."""
+    _model.update(
+        ids=[], row_of={}, spans=[], features={}, names=[], dead=0,
+        entry_rows=np.zeros(0, np.int32), entry_cols=np.zeros(0, np.int32), entry_alive=np.zeros(0, bool),
+        difficulty=np.zeros(0, np.int8), popularity_at=float("-inf"),
+    )
+
+def _refresh_popularity():
+    """Reloads global solve counts per problem, at most once per POPULARITY_TTL."""
+    if time.monotonic() - _model["popularity_at"] < POPULARITY_TTL and len(_model["popularity"]) == len(_model["ids"]):
+        return
+    counts = np.zeros(len(_model["ids"]), np.float32)
+    # The materialized solve_count is read instead of aggregating every user's progress.
+    for problem in problems_collection.find({"solve_count": {"$gt": 0}}, {"solve_count": 1}):
+        row = _model["row_of"].get(problem["_id"])
+        if row is not None:
+            counts[row] = problem["solve_count"]
+    # Log-scaled to [0, 1] so a handful of very popular problems do not dominate.
+    counts = np.log1p(counts)
+    peak = counts.max(initial=0)
+    _model["popularity"] = counts / peak if peak > 0 else counts
+    _model["popularity_at"] = time.monotonic()
+
+def _object_id(value):
+    """Converts a progress problem_id string back to the ObjectId used as catalog key."""
+    from bson import ObjectId
+    return ObjectId(value) if ObjectId.is_valid(value) else value
+
+def refresh_recommender():
+    """Brings the encoded catalog up to date, loading only problems written since the last refresh."""
+    with _lock:
+        if refresh_from_catalog(_model, {"topics": 1, "company_tag": 1, "difficulty": 1}, _encode, reset=_reset):
+            if _model["dead"] > COMPACT_RATIO * max(len(_model["entry_rows"]), 1):
+                _compact()
+            _update_row_norm()
+        _refresh_popularity()
+
+def recommend_problems(username, limit=5, company=None):
+    """Returns up to `limit` (problem_id, score, reasons) for problems the user has not solved or revised.
+
+    Scores combine overlap with the topics and companies of the user's solved problems, closeness
+    to a difficulty just above their average, and global solve popularity.
+    """
+    refresh_recommender()
+    with _lock:
+        rows, cols, alive = _model["entry_rows"], _model["entry_cols"], _model["entry_alive"]
+        difficulty, row_norm, popularity = _model["difficulty"], _model["row_norm"], _model["popularity"]
+        ids, row_of, names = list(_model["ids"]), _model["row_of"], list(_model["names"])
+    n_rows = len(ids)
+    if not n_rows:
+        return []
+
+    solved_mask = np.zeros(n_rows, bool)
+    done_mask = np.zeros(n_rows, bool)
+    for doc in progress_collection.find(
+        {"username": username, "$or": [{"solved": True}, {"revised": True}]}, {"problem_id": 1, "solved": 1, "_id": 0}
+    ):
+        row = row_of.get(_object_id(doc["problem_id"]))
+        if row is not None and row < n_rows:
+            done_mask[row] = True
+            solved_mask[row] = bool(doc.get("solved"))
+
+    # User profile: share of solved problems carrying each topic/company feature.
+    solved_entries = alive & solved_mask[rows]
+    n_solved = max(int(solved_mask.sum()), 1)
+    profile = np.bincount(cols[solved_entries], minlength=len(names)).astype(np.float32) / n_solved
+    is_company = np.array([name.startswith("company:") for name in names], bool)
+    profile *= np.where(is_company, COMPANY_WEIGHT, TOPIC_WEIGHT).astype(np.float32)
+
+    # One sparse matrix-vector product scores every problem against the profile.
+    affinity = np.bincount(rows[alive], weights=profile[cols[alive]], minlength=n_rows).astype(np.float32) * row_norm
+
+    solved_codes = difficulty[solved_mask & (difficulty >= 0)]
+    target = min(float(solved_codes.mean()) + 0.5, 2.0) if len(solved_codes) else 0.0
+    difficulty_fit = np.where(difficulty >= 0, 1 - np.abs(difficulty - target) / 2, 0.5).astype(np.float32)
+
+    scores = affinity + DIFFICULTY_WEIGHT * difficulty_fit + POPULARITY_WEIGHT * popularity[:n_rows]
+    excluded = done_mask.copy()
+    if company:
+        column = _model["features"].get(f"company:{company}")
+        tagged = np.zeros(n_rows, bool)
+        if column is not None:
+            tagged[rows[alive & (cols == column)]] = True
+        excluded |= ~tagged
+    scores[excluded] = -np.inf
+
+    k = min(limit, int((~excluded).sum()))
+    if k <= 0:
+        return []
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+
+    results = []
+    for row in top.tolist():
+        entries = np.nonzero(alive & (rows == row))[0]
+        shared = [names[col].split(":", 1)[1] for col in cols[entries] if profile[col] > 0 and not is_company[col]]
+        results.append((ids[row], float(scores[row]), shared[:3]))
+    return results
+
+def load_recommendations(username, limit=5, company=None):
+    """Returns render-ready recommendation rows with each problem's name, link and difficulty."""
+    recommended = recommend_problems(username, limit, company)
+    problems = {
+        problem["_id"]: problem
+        for problem in problems_collection.find(
+            {"_id": {"$in": [problem_id for problem_id, _, _ in recommended]}}, {"name": 1, "link": 1, "difficulty": 1}
+        )
+    }
+    return [
+        {"problem": problems[problem_id], "score": score, "reasons": reasons}
+        for problem_id, score, reasons in recommended
+        if problem_id in problems
+    ]
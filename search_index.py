@@ -0,0 +1,85 @@
+# search_index.py
+
+import re
+import threading
+from collections import Counter
+from facet_catalog import refresh_from_catalog
+
+NGRAM_SIZE = 3
+MIN_SIMILARITY = 0.3
+COMPACT_RATIO = 0.25
+
+# Process-wide trigram index over problem names. Postings are plain lists of
+# integer slots; replaced names leave a tombstone until the next compaction.
+_index = {"version": None, "watermark": None, "slots": [], "slot_of": {}, "postings": {}, "dead": 0}
+_lock = threading.Lock()
+
+def normalize(text):
+    """Lowercases text and collapses everything but letters and digits into single spaces."""
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", str(text).lower()).split())
+
+def ngrams(text):
+    """Returns the distinct padded character n-grams of normalized text."""
+    padded = f"  {text} "
+    return {padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+def _add(problem_id, name):
+    """Indexes one problem name, tombstoning any previous entry for the same problem."""
+    old_slot = _index["slot_of"].get(problem_id)
+    if old_slot is not None:
+        if _index["slots"][old_slot][1] == name:
+            return
+        _index["slots"][old_slot] = None
+        _index["dead"] += 1
+    slot = len(_index["slots"])
+    _index["slots"].append((problem_id, name))
+    _index["slot_of"][problem_id] = slot
+    for gram in ngrams(name):
+        _index["postings"].setdefault(gram, []).append(slot)
+
+def _load(problems):
+    """Adds a batch of problems to the index."""
+    for problem in problems:
+        _add(problem["_id"], normalize(problem.get("name", "")))
+
+def _reset():
+    """Empties the index before it is rebuilt from the full catalog."""
+    _index.update(slots=[], slot_of={}, postings={}, dead=0)
+
+def refresh_search_index():
+    """Brings the index up to date with the catalog, loading only problems written since the last refresh."""
+    refresh_from_catalog(
+        _index, {"name": 1}, _load, reset=_reset, lock=_lock,
+        # Compaction is a rebuild, once tombstones make up a large share of the slots.
+        rebuild_when=lambda: _index["dead"] > COMPACT_RATIO * max(len(_index["slots"]), 1),
+    )
+
+def search_problem_ids(text, limit=200):
+    """Returns problem ids ranked by fuzzy name similarity to text, best first."""
+    query = normalize(text)
+    if not query:
+        return []
+    refresh_search_index()
+
+    query_grams = ngrams(query)
+    # Candidates are gathered under the lock, so a concurrent refresh cannot append to
+    # postings or swap in a rebuilt index while they are being counted and resolved.
+    with _lock:
+        hits = Counter()
+        for gram in query_grams:
+            hits.update(_index["postings"].get(gram, ()))
+        slots = _index["slots"]
+        candidates = [(slots[slot], shared) for slot, shared in hits.most_common(limit * 5) if slots[slot] is not None]
+
+    scored = []
+    for (problem_id, name), shared in candidates:
+        # Dice similarity over n-grams tolerates typos; exact prefixes and substrings rank first.
+        score = 2 * shared / (len(query_grams) + len(ngrams(name)))
+        if name.startswith(query):
+            score += 1.0
+        elif query in name:
+            score += 0.5
+        if score >= MIN_SIMILARITY:
+            scored.append((score, name, problem_id))
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return [problem_id for _, _, problem_id in scored[:limit]]
@@ -0,0 +1,114 @@
+# stats_fetcher.py
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+
+# --- Settings ---
+# Provider URLs can be overridden from the environment, e.g. to point at a local stub server in tests.
+LEETCODE_STATS_URL = os.environ.get("LEETCODE_STATS_URL", "https://leetcode-stats-api.herokuapp.com/{username}")
+GFG_PROFILE_URL = os.environ.get("GFG_PROFILE_URL", "https://auth.geeksforgeeks.org/user/{username}/practice/")
+REQUEST_TIMEOUT = (3.05, float(os.environ.get("STATS_READ_TIMEOUT", "5")))
+RENDER_WAIT = float(os.environ.get("STATS_RENDER_WAIT", "6"))
+FRESH_TTL = float(os.environ.get("STATS_FRESH_TTL", "900"))
+STALE_TTL = float(os.environ.get("STATS_STALE_TTL", "86400"))
+FAILURE_TTL = float(os.environ.get("STATS_FAILURE_TTL", "60"))
+MAX_WORKERS = int(os.environ.get("STATS_MAX_WORKERS", "8"))
+
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=MAX_WORKERS))
+_session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=MAX_WORKERS))
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="stats-fetcher")
+
+# (provider, username) -> {"value": ..., "ok": bool, "fetched_at": float}
+_cache = {}
+_inflight = {}
+_lock = threading.Lock()
+
+# --- Providers ---
+PROVIDERS = {}
+
+def register_provider(name, label, fetch):
+    """Registers a stats provider; fetch(session, username) returns the solved count or raises."""
+    PROVIDERS[name] = {"label": label, "fetch": fetch}
+
+def fetch_leetcode_solved(session, username):
+    """Returns the total solved count from the LeetCode stats API."""
+    response = session.get(LEETCODE_STATS_URL.format(username=username), timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response.json().get("totalSolved", "N/A")
+
+def fetch_gfg_solved(session, username):
+    """Returns the score card value scraped from a GeeksforGeeks profile."""
+    response = session.get(GFG_PROFILE_URL.format(username=username), timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    soup = BeautifulSoup(response.text, "html.parser")
+    solved_tag = soup.find("div", class_="score_card_value")
+    return solved_tag.text.strip() if solved_tag else "N/A"
+
+register_provider("leetcode", "LeetCode", fetch_leetcode_solved)
+register_provider("gfg", "GeeksforGeeks", fetch_gfg_solved)
+
+# --- Cache ---
+def _fetch_into_cache(key):
+    """Runs a provider fetch and stores the result; failures never replace a good value."""
+    provider, username = key
+    try:
+        value = PROVIDERS[provider]["fetch"](_session, username)
+        entry = {"value": value, "ok": True, "fetched_at": time.monotonic()}
+    except Exception:
+        now = time.monotonic()
+        previous = _cache.get(key)
+        if previous and previous["ok"]:
+            entry = {**previous, "failed_at": now}
+        else:
+            entry = {"value": "N/A", "ok": False, "fetched_at": now, "failed_at": now}
+    with _lock:
+        _cache[key] = entry
+        _inflight.pop(key, None)
+    return entry["value"]
+
+def _schedule(key):
+    """Starts a background fetch for a key unless one is already running."""
+    with _lock:
+        future = _inflight.get(key)
+        if future is None:
+            future = _executor.submit(_fetch_into_cache, key)
+            _inflight[key] = future
+        return future
+
+def _needs_refresh(entry, now):
+    """Returns whether a cached entry is past its TTL and not in a failure back-off."""
+    if now - entry.get("failed_at", float("-inf")) < FAILURE_TTL:
+        return False
+    return not entry["ok"] or now - entry["fetched_at"] >= FRESH_TTL
+
+def get_stats(accounts):
+    """Returns {provider: solved} for {provider: username}, fetching concurrently.
+
+    Cached values (even stale ones) are returned at once and refreshed in the
+    background; only uncached accounts are waited on, for at most RENDER_WAIT seconds.
+    """
+    results = {}
+    pending = {}
+    now = time.monotonic()
+    for provider, username in accounts.items():
+        if not username or provider not in PROVIDERS:
+            continue
+        key = (provider, username)
+        entry = _cache.get(key)
+        if entry and (now - entry["fetched_at"] < STALE_TTL or not _needs_refresh(entry, now)):
+            results[provider] = entry["value"]
+            if _needs_refresh(entry, now):
+                _schedule(key)
+        else:
+            pending[provider] = _schedule(key)
+
+    done, _ = wait(pending.values(), timeout=RENDER_WAIT)
+    for provider, future in pending.items():
+        results[provider] = future.result() if future in done else "N/A"
+    return {provider: results[provider] for provider in accounts if provider in results}
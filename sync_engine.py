@@ -0,0 +1,269 @@
+# sync_engine.py
+
+import argparse
+import hashlib
+import json
+import pandas as pd
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from database import problems_collection, ensure_indexes
+from facet_catalog import bump_catalog_version
+
+CHUNK_SIZE = 5000
+BATCH_SIZE = 1000
+LOOKUP_BATCH_SIZE = 1000
+
+# Fields that make up a problem's content; the fingerprint covers exactly these.
+CONTENT_FIELDS = ("name", "link", "difficulty", "acceptance", "topics")
+
+def slugify(values):
+    """Lowercases a Series of strings and collapses every non-alphanumeric run into a dash."""
+    return values.str.lower().str.replace(r"[^a-z0-9]+", "-", regex=True).str.strip("-")
+
+def problem_keys(names, links):
+    """Derives each problem's identity from its link slug, falling back to its name.
+
+    "https://leetcode.com/problems/two-sum/description/" and "two-sum" both become "two-sum",
+    so the same problem uploaded under different titles or companies maps to one document.
+    """
+    from_problems = links.str.extract(r"/problems/([^/?#]+)", expand=False)
+    last_segment = links.str.extract(r"([^/?#]+)/?(?:[?#].*)?$", expand=False)
+    slugs = slugify(from_problems.fillna(last_segment).where(links.str.contains("/", regex=False)).fillna(""))
+    keys = slugs.where(slugs != "", slugify(names))
+    # Names without ASCII letters or digits (e.g. non-Latin titles) would otherwise all share
+    # the empty key and collapse into one problem; they are keyed by a hash of the name instead.
+    empty = keys == ""
+    keys[empty] = names[empty].map(lambda name: "name-" + hashlib.sha1(name.encode()).hexdigest()[:16])
+    return keys
+
+def fingerprint(doc):
+    """Returns a stable hash of a problem's content fields."""
+    content = json.dumps([doc[field] for field in CONTENT_FIELDS], sort_keys=True, default=str)
+    return hashlib.sha1(content.encode()).hexdigest()
+
+def normalize_chunk(df, problem_col, link_col=None, difficulty_col=None, acceptance_col=None, topic_col=None):
+    """Normalizes a chunk of CSV rows column-wise into fingerprinted problem documents."""
+    names = df[problem_col]
+    valid = names.notna() & (names.astype(str).str.strip() != "")
+    df = df[valid]
+
+    out = pd.DataFrame(index=df.index)
+    out["name"] = df[problem_col].astype(str).str.strip()
+    out["link"] = df[link_col].fillna("#").astype(str).str.strip() if link_col else "#"
+    out["difficulty"] = df[difficulty_col].fillna("N/A").astype(str) if difficulty_col else "N/A"
+
+    if acceptance_col:
+        acceptance = pd.to_numeric(df[acceptance_col].astype(str).str.replace("%", "", regex=False), errors="coerce")
+        out["acceptance"] = acceptance.astype(object).where(acceptance.notna(), "N/A")
+    else:
+        out["acceptance"] = "N/A"
+
+    if topic_col:
+        topics = df[topic_col].fillna("").astype(str).str.split(",")
+        out["topics"] = topics.map(lambda parts: [t.strip() for t in parts if t.strip()])
+    else:
+        out["topics"] = [[] for _ in range(len(out))]
+
+    out["key"] = problem_keys(out["name"], out["link"])
+    out = out.drop_duplicates(subset=["key"], keep="last")
+    docs = out.to_dict("records")
+    for doc in docs:
+        doc["content_hash"] = fingerprint(doc)
+    return docs, int((~valid).sum())
+
+# --- Planning ---
+def _lookup_existing(collection, docs):
+    """Returns {key: existing problem} for a batch of normalized docs.
+
+    Problems written before identity keys existed are matched by name instead.
+    """
+    projection = {"key": 1, "name": 1, "content_hash": 1, "company_tag": 1, "company": 1}
+    existing = {}
+    for problem in collection.find({"key": {"$in": [doc["key"] for doc in docs]}}, projection):
+        existing[problem["key"]] = problem
+    legacy_names = {doc["name"]: doc["key"] for doc in docs if doc["key"] not in existing}
+    if legacy_names:
+        for problem in collection.find({"name": {"$in": list(legacy_names)}, "key": {"$exists": False}}, projection):
+            existing.setdefault(legacy_names[problem["name"]], problem)
+    return existing
+
+def _plan_operation(doc, existing, company):
+    """Returns ("added" | "changed" | "unchanged", operation or None) for one normalized doc."""
+    tags = [company] if company else []
+    if existing is None:
+        update = {"$set": doc, "$currentDate": {"updated_at": True}}
+        if tags:
+            update["$addToSet"] = {"company_tag": {"$each": tags}}
+        return "added", UpdateOne({"key": doc["key"]}, update, upsert=True)
+
+    # A scalar `company` left by older uploads is folded into company_tag and dropped.
+    legacy_company = existing.get("company")
+    if legacy_company and legacy_company not in tags:
+        tags.append(legacy_company)
+    missing_tags = [tag for tag in tags if tag not in (existing.get("company_tag") or [])]
+    content_changed = existing.get("content_hash") != doc["content_hash"] or "key" not in existing
+    if not content_changed and not missing_tags and "company" not in existing:
+        return "unchanged", None
+
+    update = {"$currentDate": {"updated_at": True}}
+    if content_changed:
+        update["$set"] = doc
+    if missing_tags:
+        update["$addToSet"] = {"company_tag": {"$each": missing_tags}}
+    if "company" in existing:
+        update["$unset"] = {"company": ""}
+    return "changed", UpdateOne({"_id": existing["_id"]}, update)
+
+def _diff(source, collection, mapping, company, chunk_size, remove_missing, summary, examples, on_progress=None):
+    """Streams a CSV against the problems collection, yielding the write each changed problem needs.
+
+    Counts go into summary and the first few names per status into examples. Only the
+    keys and matched _ids seen so far are kept, so memory grows with distinct problems,
+    not with writes.
+    """
+    seen = set()
+    # Problems matched by name have no key until this sync writes one, so removals skip by _id.
+    matched_ids = set()
+    for chunk in pd.read_csv(source, chunksize=chunk_size):
+        docs, skipped = normalize_chunk(chunk, **mapping)
+        summary["rows"] += len(chunk)
+        summary["failed"] += skipped
+        docs = [doc for doc in docs if doc["key"] not in seen]
+        seen.update(doc["key"] for doc in docs)
+        for start in range(0, len(docs), LOOKUP_BATCH_SIZE):
+            batch = docs[start:start + LOOKUP_BATCH_SIZE]
+            existing = _lookup_existing(collection, batch)
+            for doc in batch:
+                match = existing.get(doc["key"])
+                if match is not None:
+                    matched_ids.add(match["_id"])
+                status, operation = _plan_operation(doc, match, company)
+                summary[status] += 1
+                if status in examples and len(examples[status]) < 20:
+                    examples[status].append(doc["name"])
+                if operation is not None:
+                    yield operation
+        if on_progress:
+            on_progress(summary)
+
+    if company and remove_missing:
+        for problem in collection.find({"company_tag": company}, {"key": 1, "name": 1}):
+            if problem["_id"] in matched_ids or problem.get("key") in seen:
+                continue
+            summary["removed"] += 1
+            if len(examples["removed"]) < 20:
+                examples["removed"].append(problem.get("name"))
+            yield UpdateOne({"_id": problem["_id"]}, {"$pull": {"company_tag": company}, "$currentDate": {"updated_at": True}})
+
+def _new_summary():
+    return {"rows": 0, "added": 0, "changed": 0, "unchanged": 0, "removed": 0, "failed": 0}
+
+def plan_sync(source, collection, mapping, company_name="", chunk_size=CHUNK_SIZE, remove_missing=False, on_progress=None):
+    """Diffs a CSV against the problems collection without writing anything.
+
+    Returns a plan whose "summary" counts added, changed, unchanged and removed problems
+    and whose "examples" name a few of each. No writes are held: commit_sync streams the
+    CSV again and writes as it diffs. With remove_missing, problems tagged with this company
+    that the CSV does not list are untagged, so it is only safe for a company's full list.
+    """
+    summary = _new_summary()
+    examples = {"added": [], "changed": [], "removed": []}
+    for _ in _diff(source, collection, mapping, company_name.strip(), chunk_size, remove_missing, summary, examples, on_progress):
+        pass
+    return {"summary": summary, "examples": examples}
+
+# --- Committing ---
+def write_batch(collection, operations):
+    """Runs a batch of planned writes with one unordered bulk_write; returns (written, failed)."""
+    if not operations:
+        return 0, 0
+    try:
+        result = collection.bulk_write(operations, ordered=False)
+        details = result.bulk_api_result
+        failed = 0
+    except BulkWriteError as e:
+        details = e.details
+        failed = len(details.get("writeErrors", []))
+    return details.get("nUpserted", 0) + details.get("nModified", 0), failed
+
+def commit_sync(source, collection, mapping, company_name="", chunk_size=CHUNK_SIZE, batch_size=BATCH_SIZE, remove_missing=False, on_progress=None):
+    """Streams a CSV against the problems collection and writes the changes batch by batch.
+
+    Returns the summary with written and failed counts. The diff is recomputed while writing,
+    so the counts reflect the database at commit time, not at preview time.
+    """
+    summary = {**_new_summary(), "written": 0}
+    examples = {"added": [], "changed": [], "removed": []}
+    batch = []
+
+    def flush():
+        written, failed = write_batch(collection, batch)
+        summary["written"] += written
+        summary["failed"] += failed
+        batch.clear()
+
+    for operation in _diff(source, collection, mapping, company_name.strip(), chunk_size, remove_missing, summary, examples, on_progress):
+        batch.append(operation)
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    if summary["written"]:
+        bump_catalog_version()
+    return summary
+
+def sync_csv(source, collection, mapping, company_name="", chunk_size=CHUNK_SIZE, batch_size=BATCH_SIZE, remove_missing=False, on_progress=None):
+    """Syncs a CSV in one streaming pass without a preview, e.g. for headless runs."""
+    return commit_sync(source, collection, mapping, company_name, chunk_size, batch_size, remove_missing, on_progress)
+
+def format_summary(summary):
+    """Formats a plan or sync summary as one line."""
+    return "  ".join(f"{label}: {summary[key]}" for key, label in (
+        ("added", "Added"), ("changed", "Changed"), ("unchanged", "Unchanged"), ("removed", "Removed"), ("failed", "Failed"),
+    ))
+
+def main():
+    """Command-line entry point for syncing very large CSV files headlessly."""
+    parser = argparse.ArgumentParser(description="Sync a company problem list CSV into MongoDB.")
+    parser.add_argument("csv_path")
+    parser.add_argument("--company", default="")
+    parser.add_argument("--problem-col", required=True)
+    parser.add_argument("--link-col")
+    parser.add_argument("--difficulty-col")
+    parser.add_argument("--acceptance-col")
+    parser.add_argument("--topic-col")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument(
+        "--remove-missing", action="store_true",
+        help="Untag problems tagged with --company that the CSV does not list. Only use with the company's full list.",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would change.")
+    args = parser.parse_args()
+    # Upserts match on the key index: without it every row scans the collection and
+    # concurrent syncs can insert the same problem twice, so refuse to run.
+    failed = ensure_indexes()
+    if "key_1" in failed or "key_1" not in problems_collection.index_information():
+        parser.exit(1, f"The unique index on problems.key is missing: {failed.get('key_1', 'not built')}. "
+                       "Remove duplicate keys and rerun.\n")
+
+    mapping = {
+        "problem_col": args.problem_col,
+        "link_col": args.link_col,
+        "difficulty_col": args.difficulty_col,
+        "acceptance_col": args.acceptance_col,
+        "topic_col": args.topic_col,
+    }
+    on_progress = lambda s: print(f"{s['rows']} rows processed", flush=True)
+    if args.dry_run:
+        plan = plan_sync(args.csv_path, problems_collection, mapping, args.company, args.chunk_size, args.remove_missing, on_progress)
+        print(format_summary(plan["summary"]))
+        return
+    summary = commit_sync(
+        args.csv_path, problems_collection, mapping, args.company,
+        args.chunk_size, args.batch_size, args.remove_missing, on_progress,
+    )
+    print(format_summary(summary))
+    print(f"Written: {summary['written']}  Failed: {summary['failed']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# tests/conftest.py
+
+import atexit
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import mongomock
+import pymongo
+import pytest
+from pymongo import monitoring
+from pymongo.errors import ServerSelectionTimeoutError
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+class LocalMongod:
+    """A throwaway mongod on a free port that outage tests can stop and restart."""
+
+    def __init__(self, binary):
+        self.binary = binary
+        self.dbpath = tempfile.mkdtemp(prefix="codetrack-mongod-")
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        self.uri = f"mongodb://127.0.0.1:{self.port}/?directConnection=true"
+        self.process = None
+        self.start()
+        atexit.register(self.close)
+
+    def start(self):
+        self.process = subprocess.Popen(
+            [self.binary, "--dbpath", self.dbpath, "--port", str(self.port), "--bind_ip", "127.0.0.1"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                with socket.create_connection(("127.0.0.1", self.port), timeout=0.5):
+                    return
+            except OSError:
+                time.sleep(0.1)
+        raise RuntimeError(f"mongod did not start on port {self.port}")
+
+    def stop(self):
+        self.process.terminate()
+        self.process.wait(timeout=30)
+
+    def close(self):
+        if self.process is not None and self.process.poll() is None:
+            self.stop()
+        shutil.rmtree(self.dbpath, ignore_errors=True)
+
+# The database under test, in order of preference:
+# - TEST_MONGODB_URI: an existing server; outage tests are skipped since it cannot be stopped.
+# - TEST_MONGOD or a mongod on PATH: a throwaway local mongod that outage tests stop and restart.
+# - Otherwise an in-process mongomock database, on which outages are simulated.
+LOCAL_MONGOD = None
+if os.environ.get("TEST_MONGODB_URI"):
+    os.environ["MONGODB_URI"] = os.environ["TEST_MONGODB_URI"]
+elif os.environ.get("TEST_MONGOD") or shutil.which("mongod"):
+    LOCAL_MONGOD = LocalMongod(os.environ.get("TEST_MONGOD") or shutil.which("mongod"))
+    os.environ["MONGODB_URI"] = LOCAL_MONGOD.uri
+    # Outage tests should fail over in about a second, not the app's five.
+    os.environ["MONGODB_SERVER_SELECTION_TIMEOUT_MS"] = "1000"
+    os.environ["MONGODB_CONNECT_TIMEOUT_MS"] = "1000"
+else:
+    os.environ["MONGODB_URI"] = "mongodb://localhost:27017"
+    _client = mongomock.MongoClient()
+    pymongo.MongoClient = lambda *args, **kwargs: _client
+REAL_SERVER = "TEST_MONGODB_URI" in os.environ or LOCAL_MONGOD is not None
+os.environ["MONGODB_DB"] = "codetrack_test"
+
+COLLECTIONS = ("problems", "users", "notes", "meta", "progress", "activity")
+
+@pytest.fixture
+def db():
+    """Returns the test database, emptied before each test."""
+    from database import get_database
+    database = get_database()
+    for name in COLLECTIONS:
+        database[name].delete_many({})
+    return database
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts the commands sent to a real mongod."""
+
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+# Listeners only apply to clients created after registration, so this happens before any test connects.
+_listener = CommandCounter()
+if REAL_SERVER:
+    monitoring.register(_listener)
+
+# Under mongomock, which sends no commands, each call of one of these methods stands in for one.
+MOCK_COMMANDS = (
+    "find", "find_one", "aggregate", "count_documents", "estimated_document_count", "distinct",
+    "insert_one", "insert_many", "update_one", "update_many", "replace_one", "delete_one", "delete_many",
+    "find_one_and_update", "bulk_write",
+)
+
+@pytest.fixture
+def db_commands(monkeypatch):
+    """Returns a callable giving the number of database commands issued so far."""
+    if REAL_SERVER:
+        return lambda: _listener.count
+    calls = {"count": 0}
+    for name in MOCK_COMMANDS:
+        method = getattr(mongomock.collection.Collection, name)
+
+        def counted(self, *args, _method=method, **kwargs):
+            calls["count"] += 1
+            return _method(self, *args, **kwargs)
+        monkeypatch.setattr(mongomock.collection.Collection, name, counted)
+    return lambda: calls["count"]
+
+# --- Outages ---
+class SimulatedOutage:
+    """Makes every mongomock call, pings included, fail the way an unreachable server does."""
+
+    def __init__(self):
+        self.originals = {name: getattr(mongomock.collection.Collection, name) for name in MOCK_COMMANDS}
+        self.originals_command = mongomock.database.Database.command
+
+    def stop(self):
+        def unreachable(*args, **kwargs):
+            raise ServerSelectionTimeoutError("simulated outage")
+        for name in MOCK_COMMANDS:
+            setattr(mongomock.collection.Collection, name, unreachable)
+        mongomock.database.Database.command = unreachable
+
+    def start(self):
+        for name, method in self.originals.items():
+            setattr(mongomock.collection.Collection, name, method)
+        mongomock.database.Database.command = self.originals_command
+
+@pytest.fixture
+def outage(db):
+    """Returns an object whose stop() and start() take the database down and bring it back.
+
+    A throwaway local mongod is really stopped and restarted; under mongomock the outage is simulated.
+    """
+    import database
+    if "TEST_MONGODB_URI" in os.environ:
+        pytest.skip("cannot stop a server given by TEST_MONGODB_URI")
+    server = LOCAL_MONGOD or SimulatedOutage()
+
+    class Outage:
+        down = False
+
+        def stop(self):
+            server.stop()
+            self.down = True
+            # The next health check pings again instead of answering from the cached state.
+            database._health_state.update(healthy=None, checked_at=0.0)
+
+        def start(self):
+            server.start()
+            self.down = False
+            database._health_state.update(healthy=None, checked_at=0.0)
+
+    control = Outage()
+    yield control
+    if control.down:
+        control.start()
@@ -0,0 +1,53 @@
+# tests/test_auth_service.py
+
+import textwrap
+import auth_service
+from streamlit.testing.v1 import AppTest
+from utility import verify_password
+
+def test_pool_started_after_a_script_run_does_not_rerun_it(tmp_path):
+    marker = tmp_path / "runs.txt"
+    script = textwrap.dedent(f"""
+        with open({str(marker)!r}, "a") as handle:
+            handle.write("run\\n")
+    """)
+    auth_service.shutdown()
+    app = AppTest.from_string(script).run()
+    assert not app.exception
+    try:
+        password_hash = auth_service.hash_password("secret")
+    finally:
+        auth_service.shutdown()
+    assert password_hash and verify_password(password_hash, "secret")
+    assert marker.read_text().count("run") == 1
+
+def test_broken_pool_reports_busy_and_is_replaced(monkeypatch):
+    from concurrent.futures.process import BrokenProcessPool
+
+    class BrokenExecutor:
+        def submit(self, *args):
+            raise BrokenProcessPool("worker died")
+
+        def shutdown(self, **kwargs):
+            pass
+
+    broken = BrokenExecutor()
+    auth_service.shutdown()
+    auth_service._state["executor"] = broken
+    assert auth_service.hash_password("secret") is None
+    assert auth_service._state["executor"] is not broken
+
+def test_register_rejects_taken_name_without_unique_index(db):
+    db.users.drop_indexes()
+    db.users.insert_one({"username": "alice", "password": "x"})
+    assert auth_service.register("alice", "secret") == auth_service.EXISTS
+    assert db.users.count_documents({"username": "alice"}) == 1
+    auth_service.shutdown()
+
+def test_slow_job_reports_busy(monkeypatch):
+    import time
+    monkeypatch.setattr(auth_service, "HASH_TIMEOUT", 0.2)
+    try:
+        assert auth_service._run(time.sleep, 2) is None
+    finally:
+        auth_service.shutdown()
@@ -0,0 +1,79 @@
+# tests/test_backup.py
+
+import datetime
+import io
+import pytest
+from bson import ObjectId
+from streamlit.testing.v1 import AppTest
+from backup import import_records, write_export
+from progress import apply_progress_changes
+
+def _seed(db):
+    ids = db.problems.insert_many([
+        {"name": f"Problem {index}", "key": f"problem-{index}", "link": f"https://leetcode.com/problems/problem-{index}/", "difficulty": "Medium"}
+        for index in range(6)
+    ]).inserted_ids
+    db.users.insert_many([{"username": name, "stats": {"solved": 0, "revised": 0}} for name in ("alice", "bob")])
+    solved_at = datetime.datetime(2024, 5, 1, 12, tzinfo=datetime.timezone.utc)
+    apply_progress_changes("alice", [
+        {"problem_id": str(ids[0]), "difficulty": "Medium", "solved": True, "solved_at": solved_at},
+        {"problem_id": str(ids[1]), "difficulty": "Medium", "solved": True, "revised": True, "solved_at": solved_at},
+        {"problem_id": str(ids[2]), "difficulty": "Medium", "revised": True},
+    ])
+    db.notes.insert_many([
+        {"username": "alice", "problem_id": ids[1], "note_text": "two pointers"},
+        {"username": "alice", "problem_id": ids[4], "note_text": "note only"},
+    ])
+    return ids
+
+def _state(db, username):
+    progress = {
+        doc["problem_id"]: (doc.get("solved", False), doc.get("revised", False))
+        for doc in db.progress.find({"username": username})
+    }
+    notes = {str(doc["problem_id"]): doc["note_text"] for doc in db.notes.find({"username": username})}
+    return progress, notes
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl", "parquet"])
+def test_export_import_round_trip(db, fmt):
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    _seed(db)
+    handle = io.BytesIO()
+    assert write_export("alice", fmt, handle, batch_size=2) == 4
+    handle.seek(0)
+    summary = import_records("bob", fmt, handle, batch_size=2)
+
+    assert summary == {"rows": 4, "progress": 3, "notes": 2, "unmatched": 0}
+    assert _state(db, "bob") == _state(db, "alice")
+    assert db.users.find_one({"username": "bob"})["stats"] == db.users.find_one({"username": "alice"})["stats"]
+
+    # Restoring the same file again changes nothing.
+    handle.seek(0)
+    import_records("bob", fmt, handle)
+    assert db.users.find_one({"username": "bob"})["stats"]["solved"] == 2
+
+def test_import_matches_problems_by_key_when_ids_differ(db):
+    _seed(db)
+    handle = io.BytesIO(
+        b"problem_id,key,name,solved,revised,note_text\n"
+        + f"{ObjectId()},problem-3,Renamed,true,false,\n".encode()
+        + b",,Problem 5,false,true,remember\n"
+        + b",missing,Nope,true,false,\n"
+    )
+    summary = import_records("bob", "csv", handle)
+    assert summary["unmatched"] == 1
+    assert summary["progress"] == 2 and summary["notes"] == 1
+
+def _render_backup_page():
+    from backup_page import backup_page
+    backup_page()
+
+def test_prepared_export_is_not_kept_in_session_state(db):
+    _seed(db)
+    app = AppTest.from_function(_render_backup_page, default_timeout=30)
+    app.session_state["username"] = "alice"
+    app.run()
+    app.button[0].click().run()
+    assert not app.exception
+    assert "backup_export" not in app.session_state
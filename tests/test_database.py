@@ -0,0 +1,37 @@
+# tests/test_database.py
+
+import logging
+import sys
+import pytest
+import database
+import sync_engine
+
+@pytest.fixture
+def fresh_indexes(db):
+    """Drops the indexes and the cached build so ensure_indexes runs again."""
+    for name in ("problems", "users"):
+        db[name].drop_indexes()
+    database.ensure_indexes.clear()
+    yield db
+    database.ensure_indexes.clear()
+
+def test_rejected_index_is_logged_and_the_rest_are_built(fresh_indexes, caplog):
+    db = fresh_indexes
+    db.users.insert_many([{"username": "alice"}, {"username": "alice"}])
+    with caplog.at_level(logging.ERROR, logger="database"):
+        failed = database.ensure_indexes()
+    assert list(failed) == ["username_1"]
+    assert "username_1" in caplog.text
+    assert "stats.score_-1" in db.users.index_information()
+    assert "key_1" in db.problems.index_information()
+
+def test_sync_cli_refuses_to_run_without_the_key_index(fresh_indexes, tmp_path, monkeypatch):
+    db = fresh_indexes
+    db.problems.insert_many([{"name": "Two Sum", "key": "two-sum"}, {"name": "Two Sum (copy)", "key": "two-sum"}])
+    csv_path = tmp_path / "company.csv"
+    csv_path.write_text("Title\nLRU Cache\n")
+    monkeypatch.setattr(sys, "argv", ["sync_engine.py", str(csv_path), "--problem-col", "Title"])
+    with pytest.raises(SystemExit) as exit_info:
+        sync_engine.main()
+    assert exit_info.value.code == 1
+    assert db.problems.count_documents({"name": "LRU Cache"}) == 0
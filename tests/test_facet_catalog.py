@@ -0,0 +1,44 @@
+# tests/test_facet_catalog.py
+
+import datetime
+import pytest
+from facet_catalog import bump_catalog_version, refresh_from_catalog
+
+def _seed(db):
+    start = datetime.datetime(2024, 1, 1)
+    db.problems.insert_many([
+        {"name": f"Problem {index}", "updated_at": start + datetime.timedelta(minutes=index)} for index in range(3)
+    ])
+    bump_catalog_version()
+    return start
+
+def test_refresh_reads_only_problems_written_since_the_watermark(db):
+    start = _seed(db)
+    state = {"version": None, "watermark": None}
+    applied = []
+    assert refresh_from_catalog(state, {"name": 1}, applied.extend, batch_size=2)
+    assert sorted(problem["name"] for problem in applied) == ["Problem 0", "Problem 1", "Problem 2"]
+    assert state == {"version": 1, "watermark": start + datetime.timedelta(minutes=2)}
+    assert not refresh_from_catalog(state, {"name": 1}, applied.extend)
+
+    applied.clear()
+    db.problems.update_one({"name": "Problem 0"}, {"$set": {"name": "Renamed", "updated_at": start + datetime.timedelta(minutes=5)}})
+    bump_catalog_version()
+    assert refresh_from_catalog(state, {"name": 1}, applied.extend)
+    # The problem sharing the old watermark is re-read along with the rename.
+    assert sorted(problem["name"] for problem in applied) == ["Problem 2", "Renamed"]
+    assert state == {"version": 2, "watermark": start + datetime.timedelta(minutes=5)}
+
+def test_failed_refresh_keeps_the_version_so_it_is_retried(db):
+    _seed(db)
+    state = {"version": None, "watermark": None}
+
+    def fail(batch):
+        raise RuntimeError("store failed")
+    with pytest.raises(RuntimeError):
+        refresh_from_catalog(state, {"name": 1}, fail)
+    assert state["version"] is None
+
+    applied = []
+    assert refresh_from_catalog(state, {"name": 1}, applied.extend)
+    assert len(applied) == 3
@@ -0,0 +1,32 @@
+# tests/test_instrumentation.py
+
+import json
+import instrumentation
+from streamlit.testing.v1 import AppTest
+
+def _script():
+    import streamlit as st
+    from instrumentation import finish_rerun, render_debug_panel, span, start_rerun
+    start_rerun()
+    try:
+        with span("save"):
+            pass
+        if not st.session_state.get("saved"):
+            st.session_state.saved = True
+            st.rerun()
+    finally:
+        finish_rerun()
+    render_debug_panel()
+
+def test_reruns_cut_short_by_st_rerun_are_logged_and_shown(tmp_path, monkeypatch):
+    log = tmp_path / "reruns.jsonl"
+    monkeypatch.setattr(instrumentation, "INSTRUMENTATION_ENABLED", True)
+    monkeypatch.setattr(instrumentation, "INSTRUMENTATION_LOG", str(log))
+    app = AppTest.from_function(_script, default_timeout=30).run()
+    assert not app.exception
+
+    records = [json.loads(line) for line in log.read_text().splitlines()]
+    assert len({record["rerun_id"] for record in records}) == 2
+    assert sum(record.get("name") == "save" for record in records) == 2
+    labels = [expander.label for expander in app.sidebar.expander]
+    assert labels == ["🛠️ Instrumentation", "🛠️ Previous rerun (ended in st.rerun)"]
@@ -0,0 +1,110 @@
+# tests/test_local_cache.py
+
+import time
+import pytest
+import pymongo
+import local_cache
+from problem_queries import save_note, save_progress_changes, save_revised, save_solved
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """Enables the local cache on a fresh SQLite file; the outbox is flushed explicitly by the tests."""
+    monkeypatch.setattr(local_cache, "LOCAL_CACHE_PATH", str(tmp_path / "cache.sqlite"))
+    # A non-None flusher keeps start_flusher from starting the background thread.
+    monkeypatch.setitem(local_cache._state, "flusher", "disabled")
+    monkeypatch.setitem(local_cache._state, "primed", {})
+    monkeypatch.setitem(local_cache._state, "conn", None)
+    yield local_cache
+    if local_cache._state["conn"] is not None:
+        local_cache._state["conn"].close()
+
+def _reopen(cache):
+    """Simulates an app restart: the SQLite connection is closed and opened again from the file."""
+    cache._state["conn"].close()
+    cache._state["conn"] = None
+    cache._state["primed"].clear()
+
+def _seed(db):
+    ids = db.problems.insert_many([{"name": f"Problem {index}", "difficulty": "Easy"} for index in range(3)]).inserted_ids
+    db.users.insert_one({"username": "alice", "stats": {"solved": 0, "revised": 0}})
+    return [str(problem_id) for problem_id in ids]
+
+def _flush_all(cache):
+    while cache.flush_outbox():
+        pass
+
+def test_outbox_survives_an_outage_and_a_restart(db, cache, outage):
+    ids = _seed(db)
+    outage.stop()
+    save_solved("alice", ids[0], True, "Easy")
+    save_progress_changes("alice", [{"problem_id": ids[1], "difficulty": "Easy", "revised": True}])
+    save_note("alice", ids[2], "offline note")
+    with pytest.raises(pymongo.errors.PyMongoError):
+        cache.flush_outbox()
+
+    _reopen(cache)
+    assert cache.pending_writes() == 3
+    # Reads are served locally while the database is still down.
+    progress = cache.get_progress("alice", ids[:2])
+    assert progress[ids[0]]["solved"] and not progress[ids[0]]["revised"]
+    assert progress[ids[1]]["revised"] and not progress[ids[1]]["solved"]
+    assert cache.get_note("alice", ids[2]) == "offline note"
+
+def test_outbox_flushes_after_reconnect(db, cache, outage):
+    ids = _seed(db)
+    outage.stop()
+    save_solved("alice", ids[0], True, "Easy")
+    save_revised("alice", ids[1], True)
+    save_note("alice", ids[2], "offline note")
+    assert not cache.refresh_catalog()
+
+    outage.start()
+    _flush_all(cache)
+    assert cache.pending_writes() == 0
+    progress = {doc["problem_id"]: doc for doc in db.progress.find({"username": "alice"})}
+    assert progress[ids[0]]["solved"] and progress[ids[1]]["revised"]
+    assert db.notes.find_one({"username": "alice"})["note_text"] == "offline note"
+    assert db.users.find_one({"username": "alice"})["stats"] == {"solved": 1, "revised": 1, "score": 1}
+
+def test_flush_resolves_each_field_by_last_writer(db, cache, outage):
+    ids = _seed(db)
+    outage.stop()
+    save_solved("alice", ids[0], True, "Easy")
+    save_revised("alice", ids[0], True)
+    save_note("alice", ids[1], "offline note")
+    outage.start()
+
+    # Meanwhile another instance, with MongoDB reachable, wrote newer values for two of those fields.
+    later = time.time() + 60
+    db.progress.insert_one({"username": "alice", "problem_id": ids[0], "solved": False, "revised": False, "_ts": {"solved": later}})
+    db.notes.insert_one({"username": "alice", "problem_id": db.problems.find_one({"name": "Problem 1"})["_id"], "note_text": "newer", "_ts": later})
+
+    _flush_all(cache)
+    progress = db.progress.find_one({"username": "alice", "problem_id": ids[0]})
+    assert progress["solved"] is False  # the newer remote write wins
+    assert progress["revised"] is True  # the offline write to the other field still lands
+    assert db.notes.find_one({"username": "alice"})["note_text"] == "newer"
+    assert db.users.find_one({"username": "alice"})["stats"]["solved"] == 0
+
+def test_login_falls_back_to_the_cached_hash_when_mongo_drops_after_a_ping(db, cache, outage):
+    import os
+    import auth_service
+    import database
+    from streamlit.testing.v1 import AppTest
+    from utility import hash_password
+
+    cache.remember_user("alice", hash_password("secret"))
+    outage.stop()
+    # The last ping succeeded moments before the server went away.
+    database._health_state.update(healthy=True, checked_at=time.monotonic())
+
+    app = AppTest.from_file(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app.py"), default_timeout=60).run()
+    app.text_input[0].input("alice")
+    app.text_input[1].input("secret")
+    try:
+        app.button[0].click().run()
+    finally:
+        auth_service.shutdown()
+    assert not app.exception
+    assert app.session_state["authenticated"]
+    assert database._health_state["healthy"] is False
@@ -0,0 +1,39 @@
+# tests/test_page_commands.py
+
+import datetime
+from streamlit.testing.v1 import AppTest
+
+def _render_problem_list():
+    from problem_list_page import problem_list_page
+    problem_list_page()
+
+def _seed(db, problems=120):
+    ids = db.problems.insert_many([
+        {"name": f"Problem {index:03}", "link": f"https://leetcode.com/problems/p{index}/", "difficulty": ["Easy", "Medium", "Hard"][index % 3],
+         "company_tag": ["Google"], "topics": ["Array"]}
+        for index in range(problems)
+    ]).inserted_ids
+    db.users.insert_one({"username": "alice", "stats": {"solved": 0, "revised": 0}})
+    solved_at = datetime.datetime.now(datetime.timezone.utc)
+    db.progress.insert_many([
+        {"username": "alice", "problem_id": str(problem_id), "solved": True, "solved_at": solved_at, "revised": index % 2 == 0}
+        for index, problem_id in enumerate(ids[::2])
+    ])
+    db.notes.insert_many([{"username": "alice", "problem_id": problem_id, "note_text": "note"} for problem_id in ids[::5]])
+
+def _warm_rerun_commands(db_commands, page_size):
+    app = AppTest.from_function(_render_problem_list, default_timeout=30)
+    app.session_state["username"] = "alice"
+    app.session_state["problem_list_page_size"] = page_size
+    app.run()
+    before = db_commands()
+    app.run()
+    assert not app.exception
+    return db_commands() - before
+
+def test_problem_list_commands_do_not_grow_with_page_size(db, db_commands):
+    _seed(db)
+    small, large = _warm_rerun_commands(db_commands, 25), _warm_rerun_commands(db_commands, 100)
+    assert small == large
+    # Catalog version and facets, the count and the page, then one progress and one notes query.
+    assert large <= 7
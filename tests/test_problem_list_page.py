@@ -0,0 +1,40 @@
+# tests/test_problem_list_page.py
+
+import problem_list_page
+from streamlit.testing.v1 import AppTest
+
+def _render_page():
+    from problem_list_page import problem_list_page
+    problem_list_page()
+
+def _seed(db):
+    db.problems.insert_many([
+        {"name": f"Problem {index}", "link": f"https://leetcode.com/problems/p{index}/", "difficulty": "Easy", "topics": ["Array"]}
+        for index in range(5)
+    ])
+    db.users.insert_one({"username": "alice", "stats": {"solved": 0, "revised": 0}})
+
+def test_recommendations_are_computed_only_on_request(db, monkeypatch):
+    _seed(db)
+    calls = []
+    monkeypatch.setattr(problem_list_page, "load_recommendations", lambda *args, **kwargs: calls.append(args) or [])
+    app = AppTest.from_function(_render_page, default_timeout=30)
+    app.session_state["username"] = "alice"
+    app.run()
+    app.run()
+    assert not app.exception
+    assert calls == []
+
+    app.button(key="load_recommendations").click().run()
+    assert calls == [("alice",)]
+
+def test_recommendations_skip_the_database_when_offline(db, monkeypatch):
+    _seed(db)
+    monkeypatch.setattr(problem_list_page, "check_db_connection", lambda: False)
+    monkeypatch.setattr(problem_list_page, "load_recommendations", lambda *args, **kwargs: 1 / 0)
+    app = AppTest.from_function(_render_page, default_timeout=30)
+    app.session_state["username"] = "alice"
+    app.run()
+    app.button(key="load_recommendations").click().run()
+    assert not app.exception
+    assert any("unavailable offline" in warning.value for warning in app.warning)
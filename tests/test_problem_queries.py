@@ -0,0 +1,18 @@
+# tests/test_problem_queries.py
+
+from problem_queries import sample_problems
+import search_index
+
+def test_sample_keeps_search_hits_when_excluding(db):
+    ids = db.problems.insert_many([{"name": f"Problem {index}"} for index in range(10)]).inserted_ids
+    hits, solved = ids[:3], ids[:1]
+    picks = sample_problems({"_id": {"$in": hits}}, size=10, exclude_ids=solved)
+    assert {pick["_id"] for pick in picks} == set(hits[1:])
+
+def test_search_ranks_prefix_matches_first(db, monkeypatch):
+    db.problems.insert_many([{"name": "Two Sum"}, {"name": "Three Sum"}, {"name": "Sum of Two Integers"}])
+    # Earlier tests may have indexed another catalog under the same version number.
+    monkeypatch.setitem(search_index._index, "version", None)
+    ranked = search_index.search_problem_ids("two sum")
+    names = {problem["_id"]: problem["name"] for problem in db.problems.find()}
+    assert names[ranked[0]] == "Two Sum"
@@ -0,0 +1,59 @@
+# tests/test_progress.py
+
+import datetime
+from bson import ObjectId
+from progress import apply_progress_changes, migrate_user_progress, set_solved
+
+def _seed(db):
+    problem_id = db.problems.insert_one({"name": "Two Sum", "difficulty": "Easy"}).inserted_id
+    db.users.insert_one({"username": "alice", "stats": {"solved": 0, "revised": 0}})
+    return str(problem_id)
+
+def test_grid_save_counts_against_stored_progress(db):
+    problem_id = _seed(db)
+    # The grid rendered the problem unsolved, then another tab solved it.
+    set_solved("alice", problem_id, True, "Easy")
+    apply_progress_changes("alice", [{"problem_id": problem_id, "difficulty": "Easy", "solved": True}])
+
+    stats = db.users.find_one({"username": "alice"})["stats"]
+    assert stats["solved"] == 1
+    assert db.problems.find_one({"_id": ObjectId(problem_id)})["solve_count"] == 1
+
+def test_grid_save_applies_real_changes(db):
+    problem_id = _seed(db)
+    written = apply_progress_changes("alice", [{"problem_id": problem_id, "difficulty": "Easy", "solved": True, "revised": True}])
+    assert written == 1
+    assert db.users.find_one({"username": "alice"})["stats"] == {"solved": 1, "revised": 1, "score": 1}
+    apply_progress_changes("alice", [{"problem_id": problem_id, "difficulty": "Easy", "solved": False}])
+    assert db.users.find_one({"username": "alice"})["stats"]["solved"] == 0
+
+def test_migration_moves_legacy_progress_once(db):
+    easy, medium, hard = (
+        str(db.problems.insert_one({"name": name, "difficulty": difficulty}).inserted_id)
+        for name, difficulty in (("Two Sum", "Easy"), ("LRU Cache", "Medium"), ("Word Ladder", "Hard"))
+    )
+    day = datetime.datetime(2024, 1, 2, 9, 30)
+    db.users.insert_one({"username": "alice", "progress": {
+        easy: {"solved": True, "solved_at": day, "revised": True},
+        medium: {"solved": True, "solved_at": day + datetime.timedelta(days=1), "revised": False},
+        hard: {"solved": False, "solved_at": None, "revised": True},
+    }})
+
+    assert migrate_user_progress("alice") == 3
+    progress = {doc["problem_id"]: doc for doc in db.progress.find({"username": "alice"})}
+    assert (progress[easy]["solved"], progress[easy]["revised"]) == (True, True)
+    assert (progress[medium]["solved"], progress[medium]["revised"]) == (True, False)
+    assert (progress[hard]["solved"], progress[hard]["revised"]) == (False, True)
+    user = db.users.find_one({"username": "alice"})
+    assert "progress" not in user
+    assert user["stats"] == {"solved": 2, "revised": 2, "score": 3}
+    assert {str(doc["_id"]): doc.get("solve_count", 0) for doc in db.problems.find()} == {easy: 1, medium: 1, hard: 0}
+    activity = {doc["date"]: (doc["count"], doc["difficulty"]) for doc in db.activity.find({"username": "alice"})}
+    assert activity == {"2024-01-02": (1, {"Easy": 1}), "2024-01-03": (1, {"Medium": 1})}
+
+    # The map is gone, so a second run (the next login) changes nothing.
+    assert migrate_user_progress("alice") == 0
+    assert db.users.find_one({"username": "alice"}) == user
+    assert {str(doc["_id"]): doc.get("solve_count", 0) for doc in db.problems.find()} == {easy: 1, medium: 1, hard: 0}
+    assert db.progress.count_documents({"username": "alice"}) == 3
+    assert {doc["date"]: (doc["count"], doc["difficulty"]) for doc in db.activity.find({"username": "alice"})} == activity
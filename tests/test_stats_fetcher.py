@@ -0,0 +1,64 @@
+# tests/test_stats_fetcher.py
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import stats_fetcher
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves LeetCode-style JSON under /lc/ and a GeeksforGeeks-style page under /gfg/."""
+    behavior = {"delay": 0.0, "status": 200, "solved": 42}
+
+    def do_GET(self):
+        time.sleep(self.behavior["delay"])
+        if self.path.startswith("/lc/"):
+            body = json.dumps({"totalSolved": self.behavior["solved"]}).encode()
+        else:
+            body = f"<div class='score_card_value'>{self.behavior['solved']}</div>".encode()
+        self.send_response(self.behavior["status"])
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def stub(monkeypatch):
+    """Points both providers at a local stub server and starts from an empty cache."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    monkeypatch.setattr(stats_fetcher, "LEETCODE_STATS_URL", base + "/lc/{username}")
+    monkeypatch.setattr(stats_fetcher, "GFG_PROFILE_URL", base + "/gfg/{username}/")
+    monkeypatch.setattr(StubHandler, "behavior", {"delay": 0.0, "status": 200, "solved": 42})
+    stats_fetcher._cache.clear()
+    yield StubHandler.behavior
+    server.shutdown()
+    server.server_close()
+
+ACCOUNTS = {"leetcode": "alice", "gfg": "alice"}
+
+def test_providers_are_fetched_concurrently(stub):
+    stub["delay"] = 0.5
+    started = time.perf_counter()
+    assert stats_fetcher.get_stats(ACCOUNTS) == {"leetcode": 42, "gfg": "42"}
+    assert time.perf_counter() - started < 0.9
+
+def test_slow_provider_does_not_block_the_render(stub, monkeypatch):
+    monkeypatch.setattr(stats_fetcher, "RENDER_WAIT", 0.2)
+    stub["delay"] = 0.6
+    started = time.perf_counter()
+    assert stats_fetcher.get_stats(ACCOUNTS) == {"leetcode": "N/A", "gfg": "N/A"}
+    assert time.perf_counter() - started < 0.5
+    # The background fetch still completes and serves the next render from the cache.
+    time.sleep(0.8)
+    assert stats_fetcher.get_stats(ACCOUNTS) == {"leetcode": 42, "gfg": "42"}
+
+def test_failed_refresh_keeps_the_last_good_value(stub, monkeypatch):
+    assert stats_fetcher.get_stats({"leetcode": "alice"}) == {"leetcode": 42}
+    monkeypatch.setattr(stats_fetcher, "FRESH_TTL", 0)
+    stub["status"] = 500
+    stats_fetcher._schedule(("leetcode", "alice")).result()
+    assert stats_fetcher.get_stats({"leetcode": "alice"}) == {"leetcode": 42}
@@ -0,0 +1,55 @@
+# tests/test_sync_engine.py
+
+import io
+from sync_engine import commit_sync, plan_sync, sync_csv
+
+MAPPING = {"problem_col": "Title", "link_col": "Link", "difficulty_col": "Difficulty"}
+FULL_LIST = """Title,Link,Difficulty
+Two Sum,https://leetcode.com/problems/two-sum/,Easy
+Add Two Numbers,https://leetcode.com/problems/add-two-numbers/,Medium
+LRU Cache,https://leetcode.com/problems/lru-cache/,Medium
+"""
+
+def test_preview_holds_no_writes_and_commit_streams_them(db):
+    plan = plan_sync(io.StringIO(FULL_LIST), db.problems, MAPPING, "Google")
+    assert set(plan) == {"summary", "examples"}
+    assert plan["summary"]["added"] == 3
+    assert db.problems.count_documents({}) == 0
+
+    summary = commit_sync(io.StringIO(FULL_LIST), db.problems, MAPPING, "Google", batch_size=2)
+    assert summary["written"] == 3
+    assert db.problems.count_documents({"company_tag": "Google"}) == 3
+    assert sync_csv(io.StringIO(FULL_LIST), db.problems, MAPPING, "Google")["unchanged"] == 3
+
+def test_partial_list_keeps_company_tags_unless_asked(db):
+    sync_csv(io.StringIO(FULL_LIST), db.problems, MAPPING, "Google")
+    partial = "\n".join(FULL_LIST.splitlines()[:2])
+
+    summary = sync_csv(io.StringIO(partial), db.problems, MAPPING, "Google")
+    assert summary["removed"] == 0
+    assert db.problems.count_documents({"company_tag": "Google"}) == 3
+
+    summary = sync_csv(io.StringIO(partial), db.problems, MAPPING, "Google", remove_missing=True)
+    assert summary["removed"] == 2
+    assert db.problems.count_documents({"company_tag": "Google"}) == 1
+
+def test_names_without_a_slug_stay_distinct(db):
+    csv = "Title,Difficulty\n两数之和,Easy\n三数之和,Medium\n两数之和,Easy\n"
+    summary = sync_csv(io.StringIO(csv), db.problems, {"problem_col": "Title", "difficulty_col": "Difficulty"})
+    assert summary["added"] == 2
+    assert len({problem["key"] for problem in db.problems.find()}) == 2
+
+def test_full_list_keeps_tags_on_problems_matched_by_name(db):
+    # Problems written before identity keys existed have no key field.
+    db.problems.insert_many([
+        {"name": "Two Sum", "link": "https://leetcode.com/problems/two-sum/", "difficulty": "Easy", "company_tag": ["Google"]},
+        {"name": "LRU Cache", "link": "https://leetcode.com/problems/lru-cache/", "difficulty": "Medium", "company_tag": ["Google"]},
+    ])
+    csv = "\n".join(line for line in FULL_LIST.splitlines() if "Add Two Numbers" not in line)
+
+    plan = plan_sync(io.StringIO(csv), db.problems, MAPPING, "Google", remove_missing=True)
+    assert plan["summary"]["changed"] == 2 and plan["summary"]["removed"] == 0
+
+    summary = commit_sync(io.StringIO(csv), db.problems, MAPPING, "Google", remove_missing=True)
+    assert summary["removed"] == 0
+    assert db.problems.count_documents({"company_tag": "Google", "key": {"$exists": True}}) == 2
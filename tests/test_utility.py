@@ -0,0 +1,23 @@
+# tests/test_utility.py
+
+import pytest
+from passlib.hash import pbkdf2_sha256
+from utility import MIN_ROUNDS, hash_password, verify_and_update
+
+def test_weaker_hashes_are_upgraded_on_login():
+    weak = pbkdf2_sha256.using(rounds=1000).hash("secret")
+    verified, new_hash = verify_and_update(weak, "secret")
+    assert verified and pbkdf2_sha256.from_string(new_hash).rounds == MIN_ROUNDS
+
+def test_stronger_hashes_are_never_downgraded():
+    strong = hash_password("secret", MIN_ROUNDS * 2)
+    assert verify_and_update(strong, "secret") == (True, None)
+    assert verify_and_update(strong, "secret", MIN_ROUNDS) == (True, None)
+
+def test_work_factor_below_the_default_is_rejected():
+    with pytest.raises(ValueError):
+        hash_password("secret", 1000)
+
+def test_wrong_or_malformed_hashes_do_not_verify():
+    assert verify_and_update(hash_password("secret"), "wrong") == (False, None)
+    assert verify_and_update("not-a-hash", "secret") == (False, None)
@@ -3,6 +3,7 @@
 import streamlit as st
 import pandas as pd
 from database import problems_collection
+from sync_engine import plan_sync, commit_sync
 
 def upload_data_page():
     st.title("⚙️ Upload Company Problem List")
@@ -12,9 +13,9 @@ def upload_data_page():
 
     if uploaded_csv:
         try:
-            df = pd.read_csv(uploaded_csv)
+            # Only the header is needed to map columns; rows are streamed during sync.
+            csv_columns = pd.read_csv(uploaded_csv, nrows=0).columns.tolist()
             st.markdown("### Map Your CSV Columns")
-            csv_columns = df.columns.tolist()
 
             col1, col2 = st.columns(2)
             problem_col = col1.selectbox("Problem Name Column", csv_columns)
@@ -23,36 +24,62 @@ def upload_data_page():
             acceptance_col = col2.selectbox("Acceptance Rate Column", [None] + csv_columns)
             topic_col = col1.selectbox("Topic(s) Column", [None] + csv_columns)
 
-            if st.button("Sync to Database", type="primary"):
-                with st.spinner("Processing..."):
-                    for index, row in df.iterrows():
-                        topics_list = []
-                        if topic_col and pd.notna(row[topic_col]):
-                            topics_list = [topic.strip() for topic in str(row[topic_col]).split(',')]
-
-                        acceptance_value = "N/A"
-                        if acceptance_col and pd.notna(row[acceptance_col]):
-                            try:
-                                acceptance_value = float(str(row[acceptance_col]).replace('%',''))
-                            except:
-                                acceptance_value = "N/A"
-
-                        problem_doc = {
-                            "name": row[problem_col],
-                            "link": row[link_col] if link_col and pd.notna(row[link_col]) else "#",
-                            "company": company_name.strip(),
-                            "difficulty": row[difficulty_col] if difficulty_col and pd.notna(row[difficulty_col]) else "N/A",
-                            "acceptance": acceptance_value,
-                            "topics": topics_list,
-                        }
-
-                        problems_collection.update_one(
-                            {"name": row[problem_col]},
-                            {"$set": problem_doc},
-                            upsert=True
-                        )
-                st.success("Sync complete!")
-                st.sleep(3)
-                st.rerun()
+            mapping = {
+                "problem_col": problem_col,
+                "link_col": link_col,
+                "difficulty_col": difficulty_col,
+                "acceptance_col": acceptance_col,
+                "topic_col": topic_col,
+            }
+            remove_missing = st.checkbox(
+                "Untag problems this company's list no longer includes (only for the company's full list)",
+                value=False, disabled=not company_name.strip(),
+            )
+
+            total_rows = max(uploaded_csv.getvalue().count(b"\n"), 1)
+
+            def show_progress(progress_bar, verb):
+                return lambda summary: progress_bar.progress(
+                    min(summary["rows"] / total_rows, 1.0), text=f"{verb} {summary['rows']} rows...",
+                )
+
+            # Only the preview's counts are kept; committing streams the CSV again and writes as it goes.
+            plan_key = (uploaded_csv.file_id, company_name.strip(), tuple(mapping.items()), remove_missing)
+            if st.button("Preview Changes", type="primary"):
+                progress_bar = st.progress(0.0, text="Comparing with the database...")
+                uploaded_csv.seek(0)
+                plan = plan_sync(
+                    uploaded_csv, problems_collection, mapping, company_name,
+                    remove_missing=remove_missing, on_progress=show_progress(progress_bar, "Compared"),
+                )
+                progress_bar.empty()
+                st.session_state.sync_plan = {"key": plan_key, "summary": plan["summary"], "examples": plan["examples"]}
+
+            pending = st.session_state.get("sync_plan")
+            if pending and pending["key"] == plan_key:
+                summary = pending["summary"]
+                cols = st.columns(5)
+                cols[0].metric("Added", summary["added"])
+                cols[1].metric("Changed", summary["changed"])
+                cols[2].metric("Unchanged", summary["unchanged"])
+                cols[3].metric("Removed", summary["removed"])
+                cols[4].metric("Failed", summary["failed"])
+                for status, names in pending["examples"].items():
+                    if names:
+                        st.caption(f"**{status.title()}:** " + ", ".join(names) + (" ..." if summary[status] > len(names) else ""))
+
+                writes = summary["added"] + summary["changed"] + summary["removed"]
+                if not writes:
+                    st.info("Everything is already up to date; nothing to write.")
+                elif st.button(f"Commit {writes} write(s)", type="primary"):
+                    progress_bar = st.progress(0.0, text="Writing changes...")
+                    uploaded_csv.seek(0)
+                    result = commit_sync(
+                        uploaded_csv, problems_collection, mapping, company_name,
+                        remove_missing=remove_missing, on_progress=show_progress(progress_bar, "Synced"),
+                    )
+                    progress_bar.progress(1.0, text="Sync complete!")
+                    del st.session_state.sync_plan
+                    st.success(f"Sync complete! {result['written']} problems written, {result['failed']} failed.")
         except Exception as e:
             st.error(f"An error occurred: {e}")
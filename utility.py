@@ -2,10 +2,37 @@
 
 from passlib.hash import pbkdf2_sha256
 
-def hash_password(password):
+# Work factors below passlib's default are refused, so a configuration change can never weaken stored hashes.
+MIN_ROUNDS = pbkdf2_sha256.default_rounds
+
+def _scheme(rounds=None):
+    """Returns the hasher for a work factor; None keeps passlib's default rounds.
+
+    Hashes are only flagged for rehashing when they use fewer rounds than that,
+    never when they are stronger than the configured work factor.
+    """
+    rounds = rounds or MIN_ROUNDS
+    if rounds < MIN_ROUNDS:
+        raise ValueError(f"Password hash rounds must be at least {MIN_ROUNDS}, got {rounds}")
+    return pbkdf2_sha256.using(default_rounds=rounds, min_desired_rounds=rounds)
+
+def hash_password(password, rounds=None):
     """Hashes a password for storing securely."""
-    return pbkdf2_sha256.hash(password)
+    return _scheme(rounds).hash(password)
 
 def verify_password(stored_hash, provided_password):
     """Verifies a stored password hash against one provided by the user."""
-    return pbkdf2_sha256.verify(provided_password, stored_hash)
\ No newline at end of file
+    return pbkdf2_sha256.verify(provided_password, stored_hash)
+
+def verify_and_update(stored_hash, provided_password, rounds=None):
+    """Verifies a password and, when its hash uses another work factor, also returns a rehash.
+
+    Returns (verified, new_hash_or_None). Malformed stored hashes never verify.
+    """
+    try:
+        if not verify_password(stored_hash, provided_password):
+            return False, None
+    except (ValueError, TypeError):
+        return False, None
+    scheme = _scheme(rounds)
+    return True, scheme.hash(provided_password) if scheme.needs_update(stored_hash) else None